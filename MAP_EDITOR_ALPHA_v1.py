@@ -20,13 +20,17 @@
     #! =====================================================================
 
 
+import io
 import os
 import re
 import bpy
 import csv
+import json
 import math
+import mmap
 import time
 import pickle
+import hashlib
 import psutil
 import shutil
 import struct
@@ -37,11 +41,14 @@ import pyautogui
 import threading
 import subprocess
 import numpy as np
+import multiprocessing
 from pathlib import Path
-from itertools import cycle
+from itertools import cycle, islice
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt                
 from colorama import Fore, Style, init
-from typing import List, Dict, Set, Any, Union, Tuple, Optional, BinaryIO
+from typing import List, Dict, Set, Any, Union, Tuple, Optional, BinaryIO, TextIO, Iterable, Iterator, Callable
 
 
 #! SETUP 0 (Map Name)                           Control + F    "map=="  to jump to The Map Creation section
@@ -59,6 +66,8 @@ class Folder:
     SHOP_RACE_MAP = SHOP_RACE / f"{MAP_FILENAME}" 
     SHOP_MESH_LANDMARK = SHOP / "BMS" / f"{MAP_FILENAME}LM"
     SHOP_MESH_CITY = SHOP / "BMS" / f"{MAP_FILENAME}CITY"
+    SHOP_BOUND_LANDMARK = SHOP / "BND" / f"{MAP_FILENAME}LM"
+    SHOP_BOUND_CITY = SHOP / "BND" / f"{MAP_FILENAME}CITY"
     
     MIDTOWNMADNESS = BASE / "MidtownMadness"
     USER_RESOURCES = BASE / "Resources" / "UserResources"
@@ -93,6 +102,7 @@ cruise_start_position = (40.0, 30.0, -40.0)
 
 round_vector_values = True      
 disable_progress_bar = False    # Change to "True" if you want to disable the progress bar (this will display Errors and Warnings again)
+use_resource_cache = True       # Change to "False" if you want to parse the Editor Resource files on every run instead of loading the cached copies (stored in "Resources / UserResources / CACHE")
 
 ################################################################################################################
 
@@ -132,9 +142,23 @@ more_logs = False               # Change to "True" if you want additional logs a
 lower_portals = False           # Change to "True" if you want to lower the portals. This may be useful when you're "truncating" the cells file, and have cells below y = 0. This however may lead to issues with the AI
 empty_portals = False           # Change to "True" if you want to create an empty portals file. This may be useful if you're testing a city with tens of thousands of polygons, which the portals file cannot handle. Nevertheless, we can still test the city by creating an empty portals file (this will compromise game visiblity)
 truncate_cells = False			# Change to "True" if you want to truncate the characters in the cells file. This may be useful for testing large cities. A maximum of 254 characters is allowed per row in the cells file (~80 polygons). To avoid crashing the game, truncate any charachters past 254 (may compromise game visibility - lowering portals may mitigate this issue)
+portal_workers = 0              # Number of worker processes used to create the portals ("0" uses all CPU cores, "1" creates them on a single core). This speeds up large Maps, the portals file stays the same
+portal_chunk_size = 256         # Number of neighbouring cell pairs handed to a worker process at once
+use_portal_cache = True         # Change to "False" if you want to recreate all portals on every run instead of only the portals of changed cells (stored in "Resources / UserResources / CACHE")
+set_cell_pvs = False            # Change to "True" if you want each cell in the cells file to only list the "always_visible" cells it can see through the portals. Rows that are still too long are then truncated as with "truncate_cells". This may be slow for large Maps
+pvs_max_sources = 64            # Maximum number of "always_visible" cells whose visibility is traced through the portals, the remaining cells stay visible from every cell
+pvs_max_depth = 8               # Maximum number of portals a line of sight may pass through. A cell that can see further than this gets no potentially visible set and stays visible from every cell
 
 fix_faulty_quads = False        # Change to "True" if you want to fix faulty quads (e.g. self-intersecting quads)
 
+weld_vertices = False           # Change to "True" if you want polygons to share corners that are within "weld_tolerance" of each other. This makes the BND file smaller and keeps large Maps under the vertex limit for longer
+weld_tolerance = 0.001          # Maximum distance (per axis) between two corners that are welded into one vertex
+
+set_bound_grid = True           # Change to "False" if you don't want to build the collision grid in the BND file. The grid lets the game only test the polygons near the car instead of every polygon in the Map
+bound_grid_cell_size = 12.0     # Width and depth of a collision grid cell (Chicago uses cells of roughly 11 by 13 meters). Smaller cells give faster lookups but a larger BND file
+split_bounds = False            # Change to "True" if you want to split the bound file into regions ("{MAP}LM" and "{MAP}CITY" folders in "SHOP / BND") when the Map exceeds 32768 vertices or polygons. Experimental: it is not yet confirmed that the game loads these region files
+set_bound_edges = True          # Change to "False" if you don't want to store the shared edges between polygons (and their edge planes) in the BND file
+
 ################################################################################################################
 
 # Editor Debugging
@@ -166,6 +190,19 @@ debug_bounds_folder = False
 
 debug_dlp_file = False
 debug_dlp_folder = False
+
+debug_folder_workers = 0        # Number of worker processes used by the folder debuggers ("0" uses all CPU cores, "1" converts the files one at a time)
+debug_folder_chunk_size = 8     # Number of files handed to a worker process at once
+
+################################################################################################################
+
+# Codec Benchmark | The Results are written to: "Resources / Debug / BENCHMARK / ..."
+benchmark_codecs = False        # Change to "True" to time reading and writing each binary file format, and to check that reading and writing a file gives back the same bytes
+benchmark_records = 10000       # Number of records (polygons, props, portals, AI streets, ...) in each generated benchmark file
+benchmark_repeats = 3           # Number of timed runs per file format, the fastest run is reported
+
+# Self Checks
+run_self_checks = False         # Change to "True" to run the built-in checks (e.g. that vertex indices the bound file cannot store are rejected) and print which ones failed
 ################################################################################################################
 
 debug_props_data_file = Folder.EDITOR_RESOURCES / "PROPS" / "CHICAGO.BNG"          # Change the input Prop file here
@@ -223,7 +260,9 @@ def continuous_progress_bar(duration: float, buffer: str, top_divider: str, bott
         progress = (elapsed_time / duration) * 100
         progress = min(100, max(0, progress))  
         
-        update_progress_bar(progress, buffer, top_divider, bottom_divider, disable_progress_bar)
+        # Worker processes are only forked while this lock is held, so they never copy a held stdout lock
+        with progress_lock:
+            update_progress_bar(progress, buffer, top_divider, bottom_divider, disable_progress_bar)
         
         if progress >= 100:
             break
@@ -262,6 +301,8 @@ colors_one = [
 colors_two = [Fore.LIGHTGREEN_EX, Fore.GREEN,Fore.CYAN, Fore.LIGHTCYAN_EX,Fore.BLUE, Fore.LIGHTBLUE_EX]
 
 
+progress_lock = threading.Lock()
+
 progress_thread = threading.Thread(
     target = continuous_progress_bar, 
     args = (
@@ -280,13 +321,11 @@ start_time = time.time()
 #! ======================= INITIALIZATIONS & CONSTANTS ======================= !#
 
 
-vertices = [] 
 texture_names = []
 texcoords_data = {}
 
 polygons_data = []
 
-hudmap_vertices = []
 hudmap_properties = {}
 
 NO = 0  # For example, AI Street Properties ("traffic_blocked = YES")
@@ -346,6 +385,7 @@ class Threshold:
     CELL_CHARACTER_WARNING = 200
     CELL_CHARACTER_LIMIT = 0xFF    
     VERTEX_INDEX_COUNT = 0x8000
+    BOUND_GRID_ENTRY_COUNT = 0x400000
     
     
 class Magic:
@@ -842,16 +882,105 @@ bridge_config_list = [bridge_race_0, bridge_cnr]
 #! ======================= STRUCT & VECTOR CLASSES ======================= !#
 
 
+@lru_cache(maxsize = None)
+def get_struct(fmt: str) -> struct.Struct:
+    return struct.Struct(fmt)
+
+
 def read_unpack(file: BinaryIO, fmt: str) -> Tuple:
-    return struct.unpack(fmt, file.read(calc_size(fmt)))
+    if isinstance(file, BinaryReader):
+        return file.unpack(fmt)
+    
+    compiled = get_struct(fmt)
+    return compiled.unpack(file.read(compiled.size))
 
 
 def write_pack(file: BinaryIO, fmt: str, *args: object) -> None:
-    file.write(struct.pack(fmt, *args))
+    file.write(get_struct(fmt).pack(*args))
 
 
 def calc_size(fmt: str) -> int:
-    return struct.calcsize(fmt)
+    return get_struct(fmt).size
+
+
+class BinaryReader:
+    def __init__(self, data: bytes, offset: int = 0) -> None:
+        self.data = data
+        self.offset = offset
+        
+    @classmethod
+    def open(cls, input_file: Path) -> 'BinaryReader':
+        with open(input_file, "rb") as f:
+            return cls(f.read())
+        
+    @classmethod
+    def wrap(cls, file: BinaryIO) -> 'BinaryReader':
+        if isinstance(file, cls):
+            return file
+        return cls(file.read())
+    
+    def unpack(self, fmt: str) -> Tuple:
+        compiled = get_struct(fmt)
+        values = compiled.unpack_from(self.data, self.offset)
+        self.offset += compiled.size
+        return values
+    
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            end = len(self.data)
+        else:
+            end = min(self.offset + size, len(self.data))
+            
+        chunk = self.data[self.offset:end]
+        self.offset = end
+        return chunk
+    
+    def read_array(self, dtype: Union[str, np.dtype], count: int) -> np.ndarray:
+        array = np.frombuffer(self.data, dtype = dtype, count = count, offset = self.offset)
+        self.offset += array.nbytes
+        return array
+    
+    def read_cstring(self, encoding: str = "ascii") -> str:
+        end = self.data.find(b"\0", self.offset)
+        
+        if end == -1:
+            end = len(self.data)
+            
+        name = bytes(self.data[self.offset:end]).decode(encoding)
+        self.offset = min(end + 1, len(self.data))
+        return name
+    
+    def tell(self) -> int:
+        return self.offset
+    
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 1:
+            offset += self.offset
+        elif whence == 2:
+            offset += len(self.data)
+            
+        self.offset = offset
+        return self.offset
+    
+    
+def iter_named_records(data: bytes, fmt: str, encoding: str = "ascii") -> Iterator[Tuple[Tuple, str]]:
+    reader = BinaryReader(data)
+    count, = reader.unpack('<I')
+    
+    for _ in range(count):
+        yield reader.unpack(fmt), reader.read_cstring(encoding)
+        
+        
+def write_joined(f: TextIO, strings: Iterable[str], separator: str = ", ", chunk_size: int = 4096) -> None:
+    strings = iter(strings)
+    chunk = list(islice(strings, chunk_size))
+    
+    while chunk:
+        f.write(separator.join(chunk))
+        chunk = list(islice(strings, chunk_size))
+        
+        if chunk:
+            f.write(separator)
 
 
 class Vector2:
@@ -865,7 +994,8 @@ class Vector2:
 
     @staticmethod
     def readn(file: BinaryIO, count: int, byte_order: str = '<') -> List['Vector2']:
-        return [Vector2.read(file, byte_order) for _ in range(count)]
+        values = read_unpack(file, f'{byte_order}{count * 2}f')
+        return [Vector2(values[i], values[i + 1]) for i in range(0, count * 2, 2)]
             
     def write(self, file: BinaryIO, byte_order: str = '<') -> None:
         write_pack(file, f'{byte_order}2f', self.x, self.y)
@@ -917,10 +1047,16 @@ class Vector2:
         return self * (self.Mag2() ** -0.5)
     
     def __repr__(self, round_vector_values: bool = round_vector_values) -> str:
+        return Vector2.format(self.x, self.y, round_vector_values)
+    
+    @staticmethod
+    def format(x: float, y: float, round_vector_values: bool = round_vector_values) -> str:
+        x, y = float(x), float(y)
+        
         if round_vector_values:
-            return f'{round(self.x, 2):.2f}, {round(self.y, 2):.2f}'
+            return f'{round(x, 2):.2f}, {round(y, 2):.2f}'
         else:
-            return f'{self.x:f}, {self.y:f}'
+            return f'{x:f}, {y:f}'
 
 
 class Vector3:
@@ -936,11 +1072,16 @@ class Vector3:
 
     @staticmethod
     def readn(file: BinaryIO, count: int, byte_order: str = '<') -> List['Vector3']:
-        return [Vector3.read(file, byte_order) for _ in range(count)]
+        values = read_unpack(file, f'{byte_order}{count * 3}f')
+        return [Vector3(values[i], values[i + 1], values[i + 2]) for i in range(0, count * 3, 3)]
     
     def write(self, file: BinaryIO, byte_order: str = '<') -> None:
         write_pack(file, f'{byte_order}3f', self.x, self.y, self.z)
         
+    @staticmethod
+    def writen(file: BinaryIO, vectors: List['Vector3'], byte_order: str = '<') -> None:
+        write_pack(file, f'{byte_order}{len(vectors) * 3}f', *[value for vector in vectors for value in (vector.x, vector.y, vector.z)])
+        
     @staticmethod
     def binary_size() -> int:
         return calc_size('3f')
@@ -957,6 +1098,9 @@ class Vector3:
     
     def __getitem__(self, key: str) -> float:
         return self._data[key]
+    
+    def __iter__(self) -> Iterator[float]:
+        return iter((self.x, self.y, self.z))
 
     def __setitem__(self, key: str, value: float) -> None:
         if key in self._data:
@@ -1016,10 +1160,22 @@ class Vector3:
         self.z = z
                 
     def __repr__(self, round_vector_values: bool = round_vector_values) -> str:
+        return Vector3.format(self.x, self.y, self.z, round_vector_values)
+    
+    @staticmethod
+    def format(x: float, y: float, z: float, round_vector_values: bool = round_vector_values) -> str:
+        x, y, z = float(x), float(y), float(z)
+        
         if round_vector_values:
-            return f'{{ {round(self.x, 2):.2f}, {round(self.y, 2):.2f}, {round(self.z, 2):.2f} }}'
+            return f'{{ {round(x, 2):.2f}, {round(y, 2):.2f}, {round(z, 2):.2f} }}'
         else:
-            return f'{{ {self.x:f}, {self.y:f}, {self.z:f} }}'
+            return f'{{ {x:f}, {y:f}, {z:f} }}'
+        
+    @staticmethod
+    def format_array(array: np.ndarray, chunk_size: int = 4096) -> Iterator[str]:
+        for start in range(0, len(array), chunk_size):
+            for x, y, z in array[start:start + chunk_size].tolist():
+                yield Vector3.format(x, y, z)
         
         
 class Vector4:
@@ -1039,6 +1195,12 @@ class Vector4:
 
 
 class Polygon:
+    DTYPE = np.dtype([
+        ('cell_id', '<u2'), ('material_index', 'u1'), ('flags', 'u1'), 
+        ('vertex_index', '<u2', (4,)), ('plane_edges', '<f4', (4, 3)), 
+        ('normal', '<f4', (3,)), ('distance', '<f4')
+        ])
+    
     def __init__(self, cell_id: int, material_index: int, flags: int, vertex_index: List[int],
                  plane_edges: List[Vector3], plane_normal: Vector3, plane_distance: float, 
                  cell_type: int = 0, always_visible: bool = False) -> None:
@@ -1070,30 +1232,24 @@ class Polygon:
           
     @classmethod
     def read(cls, f: BinaryIO) -> 'Polygon':
-        cell_id, material_index, = read_unpack(f, '<HB')
-        flags = read_unpack(f, '<B')
-        vertex_index = read_unpack(f, '<4H') 
-        plane_edges = Vector3.readn(f, Shape.QUAD, '<')
-        plane_normal = Vector3.read(f, '<')
-        plane_distance = read_unpack(f, '<f')
+        cell_id, material_index, flags, *values = read_unpack(f, '<HBB4H16f')
+        vertex_index = tuple(values[:4])
+        plane_edges = [Vector3(*values[i:i + 3]) for i in range(4, 16, 3)]
+        plane_normal = Vector3(*values[16:19])
+        plane_distance = values[19]
         return cls(cell_id, material_index, flags, vertex_index, plane_edges, plane_normal, plane_distance)
             
     def write(self, f: BinaryIO) -> None:            
-        if len(self.vertex_index) == Shape.TRIANGLE:  # Each polygon requires four vertex indices
-            self.vertex_index += (0,)
+        vertex_index = list(self.vertex_index) + [0] * (Shape.QUAD - len(self.vertex_index))  # Each polygon requires four vertex indices
+        plane_edges = [value for edge in self.plane_edges for value in (edge.x, edge.y, edge.z)]
         
-        write_pack(f, '<HB', self.cell_id, self.material_index)
-        write_pack(f, '<B', self.flags)
-        write_pack(f, '<4H', *self.vertex_index)
-
-        for edge in self.plane_edges:
-            edge.write(f, '<')
-            
-        self.plane_normal.write(f, '<')
-        write_pack(f, '<f', self.plane_distance)
+        write_pack(f, '<HBB4H16f', 
+                   self.cell_id, self.material_index, self.flags, *vertex_index, *plane_edges, 
+                   self.plane_normal.x, self.plane_normal.y, self.plane_normal.z, self.plane_distance)
     
     def __repr__(self, bnd_instance) -> str:
         vertices_coordinates = [bnd_instance.vertices[idx] for idx in self.vertex_index]
+        vertices_coordinates = ', '.join(Vector3.format(vertex.x, vertex.y, vertex.z) for vertex in vertices_coordinates)
         # plane_d = ', '.join(f'{d:.2f}' for d in self.plane_d)
         return f"""
 POLYGON
@@ -1101,7 +1257,7 @@ POLYGON
     Material Index: {self.material_index}
     Flags: {self.flags}
     Vertex Indices: {self.vertex_index}
-    Vertices Coordinates: {vertices_coordinates}
+    Vertices Coordinates: [{vertices_coordinates}]
     Plane Edges: {self.plane_edges}
     Plane N: {self.plane_normal}
     Plane D: {self.plane_distance}
@@ -1119,9 +1275,384 @@ class Default:
     GAP_2 = 101
 
 
+class PolygonTable:
+    COLUMNS = {
+        'cell_id': (np.int32, ()),
+        'material_index': (np.int32, ()),
+        'flags': (np.int32, ()),
+        'cell_type': (np.int32, ()),
+        'always_visible': (np.bool_, ()),
+        'vertex_count': (np.int32, ()),
+        'vertex_index': (np.int64, (4,)),
+        'plane_edges': (np.float64, (4, 3)),
+        'plane_normal': (np.float64, (3,)),
+        'plane_distance': (np.float64, ()),
+        }
+    
+    def __init__(self, capacity: int = 1024) -> None:
+        self.count = 0
+        self.columns = {name: np.zeros((capacity,) + shape, dtype = dtype) for name, (dtype, shape) in self.COLUMNS.items()}
+        
+    @classmethod
+    def from_polygons(cls, polygons: List[Polygon]) -> 'PolygonTable':
+        table = cls(max(len(polygons), 1))
+        
+        for poly in polygons:
+            table.append(poly)
+            
+        return table
+    
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name][:self.count]
+    
+    def reserve(self, capacity: int) -> None:
+        current_capacity = len(self.columns['cell_id'])
+        
+        if capacity <= current_capacity:
+            return
+        
+        new_capacity = max(capacity, current_capacity * 2)
+        
+        for name, array in self.columns.items():
+            grown = np.zeros((new_capacity,) + array.shape[1:], dtype = array.dtype)
+            grown[:self.count] = array[:self.count]
+            self.columns[name] = grown
+        
+    def append(self, poly: Polygon) -> None:
+        self.reserve(self.count + 1)
+        row = self.count
+        
+        vertex_count = len(poly.vertex_index)
+        
+        self.columns['cell_id'][row] = poly.cell_id
+        self.columns['material_index'][row] = poly.material_index
+        self.columns['flags'][row] = poly.flags
+        self.columns['cell_type'][row] = poly.cell_type
+        self.columns['always_visible'][row] = poly.always_visible
+        self.columns['vertex_count'][row] = vertex_count
+        self.columns['vertex_index'][row] = 0
+        self.columns['vertex_index'][row, :vertex_count] = poly.vertex_index
+        self.columns['plane_edges'][row] = [(edge.x, edge.y, edge.z) for edge in poly.plane_edges]
+        self.columns['plane_normal'][row] = (poly.plane_normal.x, poly.plane_normal.y, poly.plane_normal.z)
+        self.columns['plane_distance'][row] = poly.plane_distance
+        
+        self.count += 1
+        
+    def extend(self, columns: Dict[str, np.ndarray]) -> None:
+        num_rows = len(columns['cell_id'])
+        start, end = self.count, self.count + num_rows
+        
+        self.reserve(end)
+        
+        for name, array in self.columns.items():
+            array[start:end] = columns.get(name, 0)
+            
+        self.count = end
+        
+    def take(self, rows: np.ndarray) -> 'PolygonTable':
+        table = PolygonTable(max(len(rows), 1))
+        table.extend({name: self.columns[name][rows] for name in self.COLUMNS})
+        return table
+        
+    def num_verts(self) -> np.ndarray:
+        return np.where(self.column('flags') & Shape.QUAD, Shape.QUAD, Shape.TRIANGLE)
+    
+    def to_records(self) -> np.ndarray:
+        vertex_index = self.column('vertex_index')
+        
+        # The BND stores vertex indices as unsigned shorts, a larger index must not wrap around
+        invalid = ((vertex_index < 0) | (vertex_index > 0xFFFF)).any(axis = 1)
+        
+        if invalid.any():
+            row = int(np.argmax(invalid))
+            error_message = f"""
+            ***ERROR***
+            Polygon {row} (cell {int(self.columns['cell_id'][row])}) uses the vertex indices {vertex_index[row].tolist()}, 
+            but the bound file can only store indices from 0 to {0xFFFF}. Please set "weld_vertices" or "split_bounds" to True.
+            """
+            raise ValueError(error_message)
+        
+        records = np.zeros(self.count, dtype = Polygon.DTYPE)
+        records['cell_id'] = self.column('cell_id')
+        records['material_index'] = self.column('material_index')
+        records['flags'] = self.column('flags')
+        records['vertex_index'] = vertex_index
+        records['plane_edges'] = self.column('plane_edges')
+        records['normal'] = self.column('plane_normal')
+        records['distance'] = self.column('plane_distance')
+        return records
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def __getitem__(self, index: int) -> Polygon:
+        if index < 0:
+            index += self.count
+            
+        if not 0 <= index < self.count:
+            raise IndexError(f"Polygon index {index} out of range")
+        
+        vertex_count = int(self.columns['vertex_count'][index])
+        
+        return Polygon(
+            int(self.columns['cell_id'][index]), int(self.columns['material_index'][index]), int(self.columns['flags'][index]), 
+            self.columns['vertex_index'][index, :vertex_count].tolist(), 
+            [Vector3(*edge) for edge in self.columns['plane_edges'][index].tolist()], 
+            Vector3(*self.columns['plane_normal'][index].tolist()), float(self.columns['plane_distance'][index]), 
+            int(self.columns['cell_type'][index]), bool(self.columns['always_visible'][index])
+            )
+        
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+            
+            
+class VertexBuffer:
+    DTYPE = np.dtype([('x', '<f8'), ('y', '<f8'), ('z', '<f8')])
+    
+    # The cell of a coordinate is checked first, then the cells around it
+    WELD_NEIGHBOURS = sorted(((x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)), key = lambda cell: cell != (0, 0, 0))
+    
+    def __init__(self, capacity: int = 4096, weld_tolerance: Optional[float] = None) -> None:
+        if weld_tolerance is not None and weld_tolerance <= 0:
+            error_message = f"""
+            ***ERROR***
+            The weld tolerance must be larger than 0, got {weld_tolerance}.
+            """
+            raise ValueError(error_message)
+        
+        self.count = 0
+        self.data = np.zeros(capacity, dtype = self.DTYPE)
+        self.weld_tolerance = weld_tolerance
+        self.weld_index = {}  # Quantized coordinate --> [(vertex index, x, y, z), ...]
+        
+    @property
+    def array(self) -> np.ndarray:
+        return self.data[:self.count].view(np.float64).reshape(-1, 3)
+    
+    @property
+    def records(self) -> np.recarray:
+        return self.data[:self.count].view(np.recarray)
+        
+    def reserve(self, capacity: int) -> None:
+        if capacity <= len(self.data):
+            return
+        
+        grown = np.zeros(max(capacity, len(self.data) * 2), dtype = self.DTYPE)
+        grown[:self.count] = self.data[:self.count]
+        self.data = grown
+        
+    def extend(self, coordinates: List[Tuple[float, float, float]]) -> int:
+        coordinates = np.asarray(coordinates, dtype = np.float64).reshape(-1, 3)
+        base_index = self.count
+        
+        self.reserve(self.count + len(coordinates))
+        self.data[base_index:base_index + len(coordinates)] = np.rec.fromarrays(coordinates.T, dtype = self.DTYPE)
+        self.count += len(coordinates)
+        
+        return base_index
+    
+    def add(self, coordinates: List[Tuple[float, float, float]]) -> np.ndarray:
+        coordinates = np.asarray(coordinates, dtype = np.float64).reshape(-1, 3)
+        
+        if self.weld_tolerance is None:
+            return self.extend(coordinates) + np.arange(len(coordinates))
+        
+        return self.weld(coordinates)
+    
+    def find_welded(self, x: float, y: float, z: float, cell: Tuple[int, int, int]) -> Optional[int]:
+        tolerance = self.weld_tolerance
+        cell_x, cell_y, cell_z = cell
+        
+        for offset_x, offset_y, offset_z in self.WELD_NEIGHBOURS:
+            for index, other_x, other_y, other_z in self.weld_index.get((cell_x + offset_x, cell_y + offset_y, cell_z + offset_z), ()):
+                if abs(other_x - x) <= tolerance and abs(other_y - y) <= tolerance and abs(other_z - z) <= tolerance:
+                    return index
+                
+        return None
+    
+    def weld(self, coordinates: np.ndarray) -> np.ndarray:
+        cells = np.floor(coordinates / self.weld_tolerance).astype(np.int64).tolist()
+        indices = np.empty(len(coordinates), dtype = np.int64)
+        new_coordinates = []
+        
+        for i, ((x, y, z), cell) in enumerate(zip(coordinates.tolist(), cells)):
+            cell = tuple(cell)
+            index = self.find_welded(x, y, z, cell)
+            
+            if index is None:
+                index = self.count + len(new_coordinates)
+                new_coordinates.append((x, y, z))
+                self.weld_index.setdefault(cell, []).append((index, x, y, z))
+                
+            indices[i] = index
+            
+        if new_coordinates:
+            self.extend(new_coordinates)
+            
+        return indices
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def __getitem__(self, index: int) -> np.record:
+        return self.records[index]
+    
+    def __iter__(self):
+        return iter(self.records)
+    
+    def __repr__(self) -> str:
+        return f"[{', '.join(Vector3.format(x, y, z) for x, y, z in self.array.tolist())}]"
+    
+    
+class HudmapVertices:
+    def __init__(self, polys: PolygonTable, vertices: VertexBuffer) -> None:
+        self.polys = polys
+        self.vertices = vertices
+        
+    def __len__(self) -> int:
+        return len(self.polys) - 1  # Skip the filler Polygon
+    
+    def __getitem__(self, index: int) -> List[List[float]]:
+        if index < 0:
+            index += len(self)
+            
+        row = index + 1
+        vertex_count = self.polys.columns['vertex_count'][row]
+        return self.vertices.array[self.polys.columns['vertex_index'][row, :vertex_count]].tolist()
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+            
+            
+class CellRegistry:
+    # The cells of the Map as they are created, so the CELLS file does not have to scan the mesh folders or the polygons
+    def __init__(self) -> None:
+        self.cell_types = {}
+        self.models = {}
+        self.always_visible = {}
+        
+    def add_polygon(self, cell_id: int, cell_type: int, always_visible: bool) -> None:
+        # The first polygon of a cell sets its type, the always visible cells keep the order in which they were set
+        self.cell_types.setdefault(cell_id, cell_type)
+        
+        if always_visible:
+            self.always_visible.setdefault(cell_id, None)
+            
+    def add_polygons(self, cell_ids: Iterable[int], cell_types: Iterable[int], always_visible: Iterable[bool]) -> None:
+        for cell_id, cell_type, visible in zip(cell_ids, cell_types, always_visible):
+            self.add_polygon(cell_id, cell_type, visible)
+            
+    def add_mesh(self, cell_id: int, model: int) -> None:
+        # A cell with a Drift (A2) mesh uses the Drift model, even if it also has a High mesh
+        if self.models.get(cell_id) != LevelOfDetail.DRIFT:
+            self.models[cell_id] = model
+            
+    def get_cell_type(self, cell_id: int) -> int:
+        return self.cell_types.get(cell_id, Room.DEFAULT)
+    
+    def get_always_visible(self) -> List[int]:
+        always_visible_cell_ids = list(self.always_visible)
+        
+        if Default.ROOM not in self.always_visible:
+            always_visible_cell_ids.insert(0, Default.ROOM)
+            
+        return always_visible_cell_ids
+    
+    def mesh_cells(self) -> List[int]:
+        return sorted(self.models)
+    
+            
 Default.POLYGON = Polygon(0, 0, 0, [0, 0, 0, 0], [Default.VECTOR_3 for _ in range(4)], Default.VECTOR_3, [0.0], 0)
-polys = [Default.POLYGON]
+polys = PolygonTable.from_polygons([Default.POLYGON])
+vertices = VertexBuffer(weld_tolerance = weld_tolerance if weld_vertices else None)
+hudmap_vertices = HudmapVertices(polys, vertices)
+cell_registry = CellRegistry()
         
+################################################################################################################               
+################################################################################################################          
+#! ======================= BATCH CONVERSION ======================= !#
+
+
+def convert_batch_file(convert: Callable[[Path, Path], None], input_file: Path, output_file: Path) -> Tuple[int, Optional[str]]:
+    try:
+        convert(input_file, output_file)
+        return input_file.stat().st_size, None
+    except Exception as e:
+        return 0, f"{type(e).__name__}: {e}"
+
+
+def fork_map(function: Callable, *iterables: Iterable, workers: int, chunk_size: int = 1) -> Iterator:
+    # The pool forks all of its workers when the work is submitted, which executor.map() does right away. 
+    # The progress bar thread is paused meanwhile, a child forked while it holds the stdout lock would deadlock on its first print
+    with ProcessPoolExecutor(max_workers = workers, mp_context = multiprocessing.get_context("fork")) as executor:
+        with progress_lock:
+            results = executor.map(function, *iterables, chunksize = chunk_size)
+            
+        yield from results
+
+
+class BatchConverter:
+    def __init__(self, convert: Callable[[Path, Path], None], 
+                 workers: int = debug_folder_workers, chunk_size: int = debug_folder_chunk_size) -> None:
+        
+        self.convert = convert
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        
+    @staticmethod
+    def can_fork() -> bool:
+        # Spawned workers would re-run this whole script, so only fork-capable platforms get a process pool
+        return "fork" in multiprocessing.get_all_start_methods() and not is_blender_running()
+        
+    def map(self, input_files: List[Path], output_files: List[Path]) -> Iterator[Tuple[int, Optional[str]]]:
+        convert_file = partial(convert_batch_file, self.convert)
+        
+        if self.workers == 1 or len(input_files) == 1 or not self.can_fork():
+            yield from map(convert_file, input_files, output_files)
+            return
+        
+        yield from fork_map(convert_file, input_files, output_files, workers = self.workers, chunk_size = self.chunk_size)
+            
+    def run(self, input_folder: Path, output_folder: Path, pattern: str, suffix: str = ".txt") -> List[Tuple[Path, str]]:
+        if not input_folder.exists():
+            raise FileNotFoundError(f"The folder {input_folder} does not exist.")
+
+        input_files = list(input_folder.glob(pattern))
+        
+        if not input_files:
+            raise FileNotFoundError(f"No {pattern[1:]} files found in {input_folder}.")
+
+        if not output_folder.exists():
+            print(f"The output folder {output_folder} does not exist. Creating it.")
+            output_folder.mkdir(parents = True, exist_ok = True)
+            
+        output_files = [output_folder / file.with_suffix(suffix).name for file in input_files]
+        
+        errors = []
+        total_bytes = 0
+        start_time = time.time()
+        
+        for input_file, output_file, (size, error) in zip(input_files, output_files, self.map(input_files, output_files)):
+            if error is None:
+                total_bytes += size
+                print(f"Processed {input_file.name} to {output_file.name}")
+            else:
+                errors.append((input_file, error))
+                print(f"Failed to process {input_file.name}: {error}")
+                
+        elapsed_time = max(time.time() - start_time, 1e-9)
+        num_converted = len(input_files) - len(errors)
+        
+        print(f"Converted {num_converted} of {len(input_files)} files in {elapsed_time:.2f} seconds "
+              f"({num_converted / elapsed_time:.1f} files/s, {total_bytes / elapsed_time / 1024 ** 2:.2f} MB/s)")
+        
+        for input_file, error in errors:
+            print(f"    {input_file.name}: {error}")
+            
+        return errors
+    
 ################################################################################################################               
 ################################################################################################################          
 #! ======================= BOUNDS CLASS ======================= !#
@@ -1174,6 +1705,8 @@ class Bounds:
                   
     @classmethod
     def read(cls, f: BinaryIO) -> 'Bounds':  
+        f = BinaryReader.wrap(f)
+        
         magic = read_binary_name(f, 4)      
         offset = Vector3.read(f, '<')
         x_dim, y_dim, z_dim = read_unpack(f, '<3l')
@@ -1181,13 +1714,8 @@ class Bounds:
         radius, radius_sqr = read_unpack(f, '<2f')
         bb_min = Vector3.read(f, '<')
         bb_max = Vector3.read(f, '<')
-        num_verts, num_polys = read_unpack(f, '<2l')
-        num_hot_verts_1, num_hot_verts_2, = read_unpack(f, '<2l')
-        num_edges = read_unpack(f, '<l')
-        x_scale, z_scale = read_unpack(f, '<2f')
-        num_indices, = read_unpack(f, '<l')
-        height_scale, = read_unpack(f, '<f')
-        cache_size, = read_unpack(f, '<l')
+        num_verts, num_polys, num_hot_verts_1, num_hot_verts_2, num_edges = read_unpack(f, '<5l')
+        x_scale, z_scale, num_indices, height_scale, cache_size = read_unpack(f, '<2flfl')
         
         vertices = Vector3.readn(f, num_verts, '<')
         polys = [Polygon.read(f) for _ in range(num_polys + 1)] 
@@ -1218,15 +1746,21 @@ class Bounds:
             )
     
     @classmethod
-    def initialize(cls, vertices: List[Vector3], polys: List[Polygon]) -> 'Bounds':
+    def initialize(cls, vertices: VertexBuffer, polys: PolygonTable, 
+                   grid_cell_size: Optional[float] = bound_grid_cell_size if set_bound_grid else None, 
+                   set_edges: bool = set_bound_edges) -> 'Bounds':
+        coordinates = vertices.array
+        center_coordinates = coordinates.sum(axis = 0) / len(coordinates)
+        distances_sqr = ((coordinates - center_coordinates) ** 2).sum(axis = 1)
+        
         magic = Magic.BOUND
         offset = Default.VECTOR_3
         x_dim, y_dim, z_dim = 0, 0, 0
-        center = calculate_center(vertices)
-        radius = calculate_radius(vertices, center)
-        radius_sqr = calculate_radius_squared(vertices, center)
-        bb_min = calculate_min(vertices)
-        bb_max = calculate_max(vertices)
+        center = Vector3(*center_coordinates.tolist())
+        radius = float(np.sqrt(distances_sqr.max()))
+        radius_sqr = float(distances_sqr.max())
+        bb_min = Vector3(*coordinates.min(axis = 0).tolist())
+        bb_max = Vector3(*coordinates.max(axis = 0).tolist())
         num_hot_verts_1, num_hot_verts_2 = 0, 0
         num_edges = 0
         x_scale, z_scale = 0.0, 0.0
@@ -1239,6 +1773,17 @@ class Bounds:
         edge_plane_normal = [Default.VECTOR_3] 
         edge_plane_distance = [0.0]  
         row_offsets, bucket_offsets, row_buckets, fixed_heights = [0], [0], [0], [0]  
+        
+        if grid_cell_size is not None and len(polys) > 1:
+            x_dim, y_dim, z_dim, x_scale, z_scale, height_scale, row_offsets, bucket_offsets, row_buckets, fixed_heights = \
+                Bounds.build_grid(coordinates, polys, grid_cell_size)
+            num_indices = len(row_buckets)
+            
+        if set_edges and len(polys) > 1:
+            hot_verts = vertices
+            num_hot_verts_2 = len(vertices)
+            edge_verts_1, edge_verts_2, edge_plane_normal, edge_plane_distance = Bounds.build_edges(coordinates, polys)
+            num_edges = len(edge_verts_1)
 
         return cls(
             magic, offset, x_dim, y_dim, z_dim, 
@@ -1253,30 +1798,269 @@ class Bounds:
             )
             
     def write(self, f: BinaryIO) -> None:
-        write_binary_name(f, self.magic)        
-        self.offset.write(f, '<')         
-        write_pack(f, '<3l', self.x_dim, self.y_dim, self.z_dim)
-        self.center.write(f, '<') 
-        write_pack(f, '<2f', self.radius, self.radius_sqr)
-        self.bb_min.write(f, '<')
-        self.bb_max.write(f, '<')
-        write_pack(f, '<2l', self.num_verts, self.num_polys)
-        write_pack(f, '<2l', self.num_hot_verts_1, self.num_hot_verts_2)
-        write_pack(f, '<l', self.num_edges)
-        write_pack(f, '<2f', self.x_scale, self.z_scale) 
-        write_pack(f, '<l', self.num_indices)
-        write_pack(f, '<f', self.height_scale)
-        write_pack(f, '<I', self.cache_size)
- 
-        for vertex in self.vertices:       
-            vertex.write(f, '<')   
+        header = self.magic.encode("ascii") + get_struct('<3f3l3f2f3f3f5l2flfI').pack(
+            self.offset.x, self.offset.y, self.offset.z, self.x_dim, self.y_dim, self.z_dim, 
+            self.center.x, self.center.y, self.center.z, self.radius, self.radius_sqr, 
+            self.bb_min.x, self.bb_min.y, self.bb_min.z, self.bb_max.x, self.bb_max.y, self.bb_max.z, 
+            self.num_verts, self.num_polys, self.num_hot_verts_1, self.num_hot_verts_2, self.num_edges, 
+            self.x_scale, self.z_scale, self.num_indices, self.height_scale, self.cache_size
+            )
+        
+        if isinstance(self.vertices, VertexBuffer):
+            vertex_block = self.vertices.array.astype('<f4')
+        else:
+            vertex_block = np.array([(vertex.x, vertex.y, vertex.z) for vertex in self.vertices], dtype = '<f4')
+            
+        if isinstance(self.polys, PolygonTable):
+            poly_block = self.polys.to_records()
+        else:
+            poly_block = PolygonTable.from_polygons(self.polys).to_records()
+        
+        f.write(header)
+        f.write(vertex_block.tobytes())
+        f.write(poly_block.tobytes())
+        
+        if isinstance(self.hot_verts, VertexBuffer):
+            f.write(self.hot_verts.array[:self.num_hot_verts_2].astype('<f4').tobytes())
+        else:
+            f.write(np.array([(vertex.x, vertex.y, vertex.z) for vertex in self.hot_verts[:self.num_hot_verts_2]], dtype = '<f4').tobytes())
+            
+        f.write(np.asarray(self.edge_verts_1[:self.num_edges], dtype = '<u4').tobytes())
+        f.write(np.asarray(self.edge_verts_2[:self.num_edges], dtype = '<u4').tobytes())
+        f.write(np.array([(normal.x, normal.y, normal.z) for normal in self.edge_plane_normal[:self.num_edges]], dtype = '<f4').tobytes())
+        f.write(np.asarray(self.edge_plane_distance[:self.num_edges], dtype = '<f4').tobytes())
+        
+        if self.x_dim and self.y_dim and self.z_dim:
+            f.write(np.asarray(self.row_offsets, dtype = '<u4').tobytes())
+            f.write(np.asarray(self.bucket_offsets, dtype = '<u2').tobytes())
+            f.write(np.asarray(self.row_buckets, dtype = '<u2').tobytes())
+            f.write(np.asarray(self.fixed_heights, dtype = 'u1').tobytes())
+            
+    @staticmethod
+    def build_edges(coordinates: np.ndarray, polys: PolygonTable) -> Tuple[List[int], List[int], List[Vector3], List[float]]:
+        rows = np.arange(1, len(polys))  # Skip the filler Polygon
+        vertex_count = polys.columns['vertex_count'][rows]
+        vertex_index = polys.columns['vertex_index'][rows]
+        normals = polys.columns['plane_normal'][rows]
+        
+        # Every polygon lists its closing edge first, then its other edges in winding order
+        corner = np.arange(4)
+        previous_corner = (corner - 1) % vertex_count[:, None]
+        starts = np.take_along_axis(vertex_index, previous_corner, axis = 1)
+        valid = (corner < vertex_count[:, None]) & (starts != vertex_index)
+        
+        edge_start = starts[valid]
+        edge_end = vertex_index[valid]
+        edge_poly = np.broadcast_to(np.arange(len(rows))[:, None], valid.shape)[valid]
+        
+        # Edges are keyed on their vertex pair, regardless of direction, and kept in order of first use
+        keys = np.minimum(edge_start, edge_end) * len(coordinates) + np.maximum(edge_start, edge_end)
+        _, first_use, inverse, num_faces = np.unique(keys, return_index = True, return_inverse = True, return_counts = True)
+        
+        order = np.argsort(first_use)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        edge_id = rank[inverse.ravel()]
+        first_use, num_faces = first_use[order], num_faces[order]
+        
+        verts_1, verts_2 = edge_start[first_use], edge_end[first_use]
+        first_poly = edge_poly[first_use]
+        
+        # The second polygon on each edge is the next use of that edge
+        uses = np.argsort(edge_id, kind = "stable")
+        group_start = np.cumsum(num_faces) - num_faces
+        second_poly = edge_poly[uses[np.minimum(group_start + 1, len(uses) - 1)]]
+        
+        # Shared edges point along the average of their polygon normals, open edges point outwards in the plane of their polygon
+        summed = np.stack([np.bincount(edge_id, weights = normals[edge_poly, axis], minlength = len(first_use)) for axis in range(3)], axis = 1)
+        open_edges = np.cross(coordinates[verts_2] - coordinates[verts_1], normals[first_poly])
+        edge_normals = np.where((num_faces == 1)[:, None], open_edges, summed)
+        lengths = np.sqrt(row_dot(edge_normals, edge_normals))
+        edge_normals = edge_normals / np.where(lengths > 0, lengths, 1.0)[:, None]
+        
+        # An edge is convex when each polygon lies behind the plane of the other, 
+        # concave, flat and non-manifold edges are marked with a distance of 2
+        def behind(poly_a: np.ndarray, poly_b: np.ndarray) -> np.ndarray:
+            corners_b = vertex_index[poly_b]
+            heights = ((coordinates[corners_b] - coordinates[verts_1][:, None]) * normals[poly_a][:, None]).sum(axis = 2)
+            on_edge = (corners_b == verts_1[:, None]) | (corners_b == verts_2[:, None]) | (corner >= vertex_count[poly_b][:, None])
+            return np.all(on_edge | (heights < -1e-3), axis = 1)
+        
+        convex = (num_faces == 2) & behind(first_poly, second_poly) & behind(second_poly, first_poly)
+        
+        edge_distances = np.where(convex, row_dot(edge_normals, normals[first_poly]), 2.0)
+        edge_distances[num_faces == 1] = 0.0
+        
+        return verts_1.tolist(), verts_2.tolist(), [Vector3(*normal) for normal in edge_normals.tolist()], edge_distances.tolist()
+        
+    @staticmethod
+    def build_grid(coordinates: np.ndarray, polys: PolygonTable, cell_size: float) -> Tuple:
+        if cell_size <= 0:
+            error_message = f"""
+            ***ERROR***
+            The bound grid cell size must be larger than 0, got {cell_size}.
+            """
+            raise ValueError(error_message)
         
-        for poly in self.polys:           
-            poly.write(f)
+        if len(polys) > Threshold.VERTEX_INDEX_COUNT:
+            error_message = f"""
+            ***ERROR***
+            The bound grid can store at most {Threshold.VERTEX_INDEX_COUNT - 1} polygons, got {len(polys) - 1}.
+            """
+            raise ValueError(error_message)
+        
+        bb_min = coordinates.min(axis = 0)
+        bb_max = coordinates.max(axis = 0)
+        extent = bb_max - bb_min
+        
+        x_dim = max(1, int(np.ceil(extent[0] / cell_size)))
+        z_dim = max(1, int(np.ceil(extent[2] / cell_size)))
+        x_scale = x_dim / extent[0] if extent[0] > 0 else 0.0
+        z_scale = z_dim / extent[2] if extent[2] > 0 else 0.0
+        
+        # Heights are stored as one byte per cell, scaled so that 255 is the top of the Map
+        height_scale = bb_max[1] / 255 if bb_max[1] > 0 else 0.0
+        
+        # Footprint of each polygon in grid cells (the unused fourth corner of a triangle repeats the first corner)
+        rows = np.arange(1, len(polys))  # Skip the filler Polygon
+        vertex_index = polys.columns['vertex_index'][rows]
+        used = np.arange(4) < polys.columns['vertex_count'][rows, None]
+        corners = coordinates[np.where(used, vertex_index, vertex_index[:, :1])]
+        
+        poly_min = corners.min(axis = 1)
+        poly_max = corners.max(axis = 1)
+        
+        x_start = np.clip(np.floor((poly_min[:, 0] - bb_min[0]) * x_scale), 0, x_dim - 1).astype(np.int64)
+        x_end = np.clip(np.floor((poly_max[:, 0] - bb_min[0]) * x_scale), 0, x_dim - 1).astype(np.int64)
+        z_start = np.clip(np.floor((poly_min[:, 2] - bb_min[2]) * z_scale), 0, z_dim - 1).astype(np.int64)
+        z_end = np.clip(np.floor((poly_max[:, 2] - bb_min[2]) * z_scale), 0, z_dim - 1).astype(np.int64)
+        
+        # One entry for every (polygon, cell) pair the footprint covers
+        num_x = x_end - x_start + 1
+        counts = num_x * (z_end - z_start + 1)
+        
+        if counts.sum() > Threshold.BOUND_GRID_ENTRY_COUNT:
+            error_message = f"""
+            ***ERROR***
+            The polygons cover {counts.sum()} bound grid cells in total, at most {Threshold.BOUND_GRID_ENTRY_COUNT} are allowed.
+            The largest polygon covers {counts.max()} grid cells.
+            Please increase "bound_grid_cell_size" or set "set_bound_grid" to False.
+            """
+            raise ValueError(error_message)
+        pair_poly = np.repeat(np.arange(len(rows)), counts)
+        pair_offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_x = x_start[pair_poly] + pair_offset % num_x[pair_poly]
+        pair_z = z_start[pair_poly] + pair_offset // num_x[pair_poly]
+        pair_cell = pair_z * x_dim + pair_x
+        
+        # Cell corners in world space, clamped to the polygon's bounding box
+        cell_x = bb_min[0] + (pair_x[:, None] + np.array([0, 1, 0, 1])) / x_scale if x_scale else np.full((len(pair_x), 4), bb_min[0])
+        cell_z = bb_min[2] + (pair_z[:, None] + np.array([0, 0, 1, 1])) / z_scale if z_scale else np.full((len(pair_z), 4), bb_min[2])
+        cell_x = np.clip(cell_x, poly_min[pair_poly, 0, None], poly_max[pair_poly, 0, None])
+        cell_z = np.clip(cell_z, poly_min[pair_poly, 2, None], poly_max[pair_poly, 2, None])
+        
+        # Drop the cells that lie entirely outside one of the edges of a convex polygon (seen from above)
+        footprint = corners[..., [0, 2]]
+        edges = np.roll(footprint, -1, axis = 1) - footprint
+        turns = edges[..., 0] * np.roll(edges, -1, axis = 1)[..., 1] - edges[..., 1] * np.roll(edges, -1, axis = 1)[..., 0]
+        winding = np.sign(turns.sum(axis = 1))
+        convex = (winding != 0) & np.all(turns * winding[:, None] >= -1e-6, axis = 1)
+        
+        outside = np.zeros(len(pair_poly), dtype = bool)
+        
+        for edge in range(4):
+            start = footprint[pair_poly, edge]
+            direction = edges[pair_poly, edge]
+            side = direction[:, 0, None] * (cell_z - start[:, 1, None]) - direction[:, 1, None] * (cell_x - start[:, 0, None])
+            outside |= np.all(side * winding[pair_poly, None] < -1e-6, axis = 1)
+            
+        keep = ~(outside & convex[pair_poly])
+        pair_poly, pair_cell, pair_x, pair_z, cell_x, cell_z = pair_poly[keep], pair_cell[keep], pair_x[keep], pair_z[keep], cell_x[keep], cell_z[keep]
+        
+        order = np.lexsort((pair_poly, pair_cell))
+        pair_poly, pair_cell, pair_x, pair_z, cell_x, cell_z = pair_poly[order], pair_cell[order], pair_x[order], pair_z[order], cell_x[order], cell_z[order]
+        
+        # Each cell lists its polygons in order, the high bit marks the last polygon of the cell
+        cell_start = np.r_[True, pair_cell[1:] != pair_cell[:-1]]
+        cell_end = np.r_[cell_start[1:], True]
+        row_buckets = np.concatenate(([0], rows[pair_poly] | (cell_end.astype(np.int64) << 15)))
+        
+        # Row offsets count the entries before a row, bucket offsets point into the row (0 is an empty cell)
+        row_offsets = np.searchsorted(pair_cell, np.arange(z_dim) * x_dim)
+        bucket_offsets = np.zeros(x_dim * z_dim, dtype = np.int64)
+        first_entries = np.nonzero(cell_start)[0]
+        bucket_offsets[pair_cell[first_entries]] = first_entries - row_offsets[pair_z[first_entries]] + 1
+        
+        if bucket_offsets.max() > 0xFFFF:
+            error_message = f"""
+            ***ERROR***
+            A row of the bound grid has more than {0xFFFF} entries.
+            Please increase "bound_grid_cell_size".
+            """
+            raise ValueError(error_message)
+        
+        # Highest point of each polygon inside each cell, found on its plane at the cell corners
+        normals = polys.columns['plane_normal'][rows][pair_poly]
+        origins = corners[pair_poly, 0]
+        sloped = np.abs(normals[:, 1]) > 0.01
+        slope_y = np.where(sloped, normals[:, 1], 1.0)
+        
+        plane_y = origins[:, 1, None] - (normals[:, 0, None] * (cell_x - origins[:, 0, None]) + normals[:, 2, None] * (cell_z - origins[:, 2, None])) / slope_y[:, None]
+        pair_height = np.where(sloped, plane_y.max(axis = 1), np.inf)
+        pair_height = np.clip(pair_height, poly_min[pair_poly, 1], poly_max[pair_poly, 1])
+        
+        cell_height = np.full(x_dim * z_dim, -np.inf)
+        np.maximum.at(cell_height, pair_cell, pair_height)
+        
+        fixed_heights = np.zeros(x_dim * z_dim, dtype = np.int64)
+        
+        if height_scale:
+            occupied = np.isfinite(cell_height)
+            fixed_heights[occupied] = np.clip(np.floor(cell_height[occupied] / height_scale), 0, 255)
+        
+        return (x_dim, 1, z_dim, float(x_scale), float(z_scale), float(height_scale), 
+                row_offsets.tolist(), bucket_offsets.tolist(), row_buckets.tolist(), fixed_heights.tolist())
                     
     @staticmethod
-    def create(output_file: Path, vertices: List[Vector3], polys: List[Polygon], debug_file: Path, debug_bounds: bool) -> None:
-        bnd = Bounds.initialize(vertices, polys)
+    def create(output_file: Path, vertices: VertexBuffer, polys: PolygonTable, debug_file: Path, debug_bounds: bool, 
+               split_bounds: bool = split_bounds) -> None:
+        
+        grid_cell_size = bound_grid_cell_size if set_bound_grid else None
+        
+        # The collision grid stores polygon indices in 15 bits, so the polygon count shares the vertex limit
+        if len(vertices) > Threshold.VERTEX_INDEX_COUNT or len(polys) > Threshold.VERTEX_INDEX_COUNT:
+            if split_bounds:
+                Bounds.create_split(output_file, vertices, polys, debug_file, debug_bounds)
+                return
+            
+            print(f"The map has {len(vertices)} vertices and {len(polys) - 1} polygons, which exceeds the limit of {Threshold.VERTEX_INDEX_COUNT}. "
+                  f"Consider setting \"weld_vertices\" or \"split_bounds\" to True.")
+            
+            if grid_cell_size is not None and len(polys) > Threshold.VERTEX_INDEX_COUNT:
+                warning_message = f"""
+                ***WARNING***
+                The collision grid can store at most {Threshold.VERTEX_INDEX_COUNT - 1} polygons, got {len(polys) - 1}.
+                The bound file is written without the collision grid.
+                *************\n
+                """
+                print(warning_message)
+                grid_cell_size = None
+        
+        # The grid only speeds up collision lookups, a Map that does not fit it is still exported
+        try:
+            bnd = Bounds.initialize(vertices, polys, grid_cell_size)
+        except ValueError as e:
+            if grid_cell_size is None:
+                raise
+            
+            warning_message = f"""
+            ***WARNING***
+            The collision grid could not be built: {str(e).replace("***ERROR***", "").strip()}
+            The bound file is written without the collision grid.
+            *************\n
+            """
+            print(warning_message)
+            bnd = Bounds.initialize(vertices, polys, None)
                 
         with open (output_file, "wb") as f:
             bnd.write(f)
@@ -1284,13 +2068,102 @@ class Bounds:
             if debug_bounds:
                 bnd.debug(debug_file)
                 
+    @staticmethod
+    def create_split(output_file: Path, vertices: VertexBuffer, polys: PolygonTable, debug_file: Path, debug_bounds: bool) -> None:
+        """
+        Writes "{MAP}_HITID_NN.BND" region files to "SHOP / BND / {MAP}LM" (landmark cells) and "SHOP / BND / {MAP}CITY" (city cells), 
+        next to the mesh folders "SHOP / BMS / {MAP}LM" and "SHOP / BMS / {MAP}CITY". 
+        It is not yet confirmed that the game loads bound files by these names, so this only runs when "split_bounds" is True
+        """
+        rows = np.arange(1, len(polys))  # Skip the filler Polygon
+        is_landmark = polys.column('cell_id')[rows] < Threshold.CELL_TYPE_SWITCH
+        
+        print(f"The map has {len(vertices)} vertices and {len(polys) - 1} polygons, which exceeds the limit of {Threshold.VERTEX_INDEX_COUNT}. "
+              f"Splitting the bound file into regions.")
+        
+        # A main bound file from an earlier export would otherwise still be loaded by the game
+        output_file.unlink(missing_ok = True)
+        
+        for target_folder, group_rows in [(Folder.SHOP_BOUND_LANDMARK, rows[is_landmark]), (Folder.SHOP_BOUND_CITY, rows[~is_landmark])]:
+            target_folder.mkdir(parents = True, exist_ok = True)
+            
+            # So do regions from an earlier export that had more regions
+            for stale_file in target_folder.glob(f"{output_file.stem}_[0-9][0-9]{output_file.suffix}"):
+                stale_file.unlink()
+            
+            for region, region_rows in enumerate(Bounds.partition(vertices, polys, group_rows)):
+                region_vertices, region_polys = Bounds.extract_region(vertices, polys, region_rows)
+                region_name = f"{output_file.stem}_{region:02d}"
+                
+                bnd = Bounds.initialize(region_vertices, region_polys)
+                
+                with open(target_folder / f"{region_name}{output_file.suffix}", "wb") as f:
+                    bnd.write(f)
+                    
+                if debug_bounds:
+                    bnd.debug(debug_file.parent / target_folder.name / f"{region_name}{debug_file.suffix}")
+                    
+    @staticmethod
+    def used_vertex_indices(polys: PolygonTable, rows: np.ndarray) -> np.ndarray:
+        vertex_index = polys.columns['vertex_index'][rows]
+        used = np.arange(4) < polys.columns['vertex_count'][rows, None]
+        return np.unique(vertex_index[used])
+                    
+    @staticmethod
+    def partition(vertices: VertexBuffer, polys: PolygonTable, rows: np.ndarray, 
+                  max_vertices: int = Threshold.VERTEX_INDEX_COUNT) -> List[np.ndarray]:
+        
+        # Split the polygons at the median of their centers along the longest horizontal axis,
+        # until every region has fewer than "max_vertices" polygons and references at most "max_vertices" vertices
+        coordinates = vertices.array
+        regions = []
+        pending = [rows] if len(rows) else []
+        
+        while pending:
+            region_rows = pending.pop()
+            
+            if len(region_rows) < max_vertices and len(Bounds.used_vertex_indices(polys, region_rows)) <= max_vertices:
+                regions.append(region_rows)
+                continue
+            
+            vertex_count = polys.columns['vertex_count'][region_rows]
+            used = np.arange(4) < vertex_count[:, None]
+            corners = coordinates[polys.columns['vertex_index'][region_rows]] * used[..., None]
+            centers = corners.sum(axis = 1) / vertex_count[:, None]
+            
+            extents = centers.max(axis = 0) - centers.min(axis = 0)
+            axis = 0 if extents[0] >= extents[2] else 2
+            
+            order = np.argsort(centers[:, axis], kind = "stable")
+            middle = len(order) // 2
+            pending.extend([region_rows[order[middle:]], region_rows[order[:middle]]])
+            
+        return regions
+    
+    @staticmethod
+    def extract_region(vertices: VertexBuffer, polys: PolygonTable, rows: np.ndarray) -> Tuple[VertexBuffer, PolygonTable]:
+        used_indices = Bounds.used_vertex_indices(polys, rows)
+        
+        region_vertices = VertexBuffer(max(len(used_indices), 1))
+        region_vertices.extend(vertices.array[used_indices])
+        
+        region_polys = polys.take(np.concatenate(([0], rows)))  # Keep the filler Polygon at index 0
+        vertex_index = region_polys.column('vertex_index')
+        used = np.arange(4) < region_polys.column('vertex_count')[:, None]
+        used[0] = False
+        
+        vertex_index[used] = np.searchsorted(used_indices, vertex_index[used])
+        vertex_index[~used] = 0
+        
+        return region_vertices, region_polys
+                
     def debug(self, output_file: Path) -> None:
         if not output_file.parent.exists():
             print(f"The output folder {output_file.parent} does not exist. Creating it.")
             output_file.parent.mkdir(parents = True, exist_ok = True)
         
-        with open(output_file, 'w') as out_f:
-            out_f.write(str(self))
+        with open(output_file, 'w', buffering = 1024 * 1024) as out_f:
+            self.dump(out_f)
             
     @staticmethod
     def debug_file(input_file: Path, output_file: Path, debug_bounds_file: bool) -> None:
@@ -1304,37 +2177,50 @@ class Bounds:
             print(f"The output folder {output_file.parent} does not exist. Creating it.")
             output_file.parent.mkdir(parents = True, exist_ok = True)
         
-        with open(input_file, "rb") as in_f:
-            bnd = Bounds.read(in_f)
+        bnd = MappedBounds.read(input_file)
 
-        with open(output_file, "w") as out_f:
-            out_f.write(repr(bnd))
+        try:
+            with open(output_file, "w", buffering = 1024 * 1024) as out_f:
+                bnd.dump(out_f)
+        finally:
+            bnd.close()
             
     @staticmethod
     def debug_folder(input_folder: Path, output_folder: Path, debug_bounds_folder: bool) -> None:
         if not debug_bounds_folder:
             return
 
-        if not input_folder.exists():
-            raise FileNotFoundError(f"The folder {input_folder} does not exist.")
-
-        bnd_files = list(input_folder.glob("*.BND"))
-        
-        if not bnd_files:
-            raise FileNotFoundError(f"No .BND files found in {input_folder}.")
-
-        if not output_folder.exists():
-            print(f"The output folder {output_folder} does not exist. Creating it.")
-            output_folder.mkdir(parents = True, exist_ok = True)
-
-        for file in bnd_files:
-            output_file = output_folder / file.with_suffix(".txt").name
-            Bounds.debug_file(file, output_file, debug_bounds_folder)
-            print(f"Processed {file.name} to {output_file.name}")
+        BatchConverter(partial(Bounds.debug_file, debug_bounds_file = True)).run(input_folder, output_folder, "*.BND")
                     
-    def __repr__(self) -> str:
-        polygon_polys = '\n'.join([poly.__repr__(self) for poly in self.polys])
-        return f"""
+    @staticmethod
+    def iter_vector_strings(vectors: Union[VertexBuffer, List[Vector3]]) -> Iterator[str]:
+        if isinstance(vectors, VertexBuffer):
+            return Vector3.format_array(vectors.array)
+        
+        return map(repr, vectors)
+    
+    @staticmethod
+    def write_list(f: TextIO, strings: Iterable[str]) -> None:
+        f.write("[")
+        write_joined(f, strings)
+        f.write("]")
+        
+    @staticmethod
+    def write_values(f: TextIO, values: Optional[Union[List[int], Tuple[int, ...], np.ndarray]], chunk_size: int = 4096) -> None:
+        # A bound file without a grid has no grid tables
+        if values is None:
+            f.write("None")
+            return
+        
+        if isinstance(values, np.ndarray):
+            strings = (str(value) for start in range(0, len(values), chunk_size) for value in values[start:start + chunk_size].tolist())
+        else:
+            strings = map(str, values)
+            
+        Bounds.write_list(f, strings)
+    
+    def dump(self, f: TextIO) -> None:
+        f.write(f"""
 BOUND
     Magic: {self.magic}
     Offset: {self.offset}
@@ -1357,24 +2243,218 @@ BOUND
     Height Scale: {self.height_scale:.5f}
     Cache Size: {self.cache_size}\n
     Vertices:
-    {self.vertices}\n
+    [""")
+        write_joined(f, self.iter_vector_strings(self.vertices))
+        f.write("""]\n
     ======= Polys =======
-    {polygon_polys}\n
-    ======= Split =======\n
-    Hot Verts: {self.hot_verts}
-    Edge Verts 1: {self.edge_verts_1}
-    Edge Verts 2: {self.edge_verts_2}
-    Edge Plane N: {self.edge_plane_normal}
-    Edge Plane D: {', '.join(f'{d:.2f}' for d in self.edge_plane_distance)}\n  
-    ======= Split =======\n
-    Row Offsets: {self.row_offsets}\n
-    ======= Split =======\n
-    Bucket Offsets: {self.bucket_offsets}\n
-    ======= Split =======\n
-    Row Buckets: {self.row_buckets}\n
+    """)
+        write_joined(f, (poly.__repr__(self) for poly in self.polys), "\n")
+        
+        # The hot verts, edges and grid grow with the Map, so they are streamed row by row as well
+        f.write("""\n
     ======= Split =======\n
-    Fixed Heights: {self.fixed_heights}\n
+    Hot Verts: """)
+        self.write_list(f, self.iter_vector_strings(self.hot_verts))
+        f.write("\n    Edge Verts 1: ")
+        self.write_values(f, self.edge_verts_1)
+        f.write("\n    Edge Verts 2: ")
+        self.write_values(f, self.edge_verts_2)
+        f.write("\n    Edge Plane N: ")
+        self.write_list(f, self.iter_vector_strings(self.edge_plane_normal))
+        f.write("\n    Edge Plane D: ")
+        write_joined(f, (f'{d:.2f}' for d in self.edge_plane_distance))
+        
+        for name, values in (("Row Offsets", self.row_offsets), ("Bucket Offsets", self.bucket_offsets), 
+                             ("Row Buckets", self.row_buckets), ("Fixed Heights", self.fixed_heights)):
+            f.write(f"\n\n    ======= Split =======\n\n    {name}: ")
+            self.write_values(f, values)
+            
+        f.write("\n\n    ")
+        
+    def __repr__(self) -> str:
+        buffer = io.StringIO()
+        self.dump(buffer)
+        return buffer.getvalue()
+    
+class MappedBounds:
+    def __init__(self, buffer: mmap.mmap, view: memoryview, header: Tuple, vertices: np.ndarray, polys: np.ndarray, 
+                 hot_verts: np.ndarray, edge_verts_1: np.ndarray, edge_verts_2: np.ndarray, 
+                 edge_plane_normal: np.ndarray, edge_plane_distance: np.ndarray,
+                 row_offsets: Optional[np.ndarray], bucket_offsets: Optional[np.ndarray], 
+                 row_buckets: Optional[np.ndarray], fixed_heights: Optional[np.ndarray]) -> None:
+        
+        self.buffer = buffer
+        self.view = view
+        (self.magic, self.offset, self.x_dim, self.y_dim, self.z_dim, 
+         self.center, self.radius, self.radius_sqr, self.bb_min, self.bb_max, 
+         self.num_verts, self.num_polys, self.num_hot_verts_1, self.num_hot_verts_2, self.num_edges, 
+         self.x_scale, self.z_scale, self.num_indices, self.height_scale, self.cache_size) = header
+        
+        self.vertices = vertices
+        self.polys = polys
+        
+        self.hot_verts = hot_verts
+        self.edge_verts_1 = edge_verts_1
+        self.edge_verts_2 = edge_verts_2
+        self.edge_plane_normal = edge_plane_normal
+        self.edge_plane_distance = edge_plane_distance
+        self.row_offsets = row_offsets
+        self.bucket_offsets = bucket_offsets
+        self.row_buckets = row_buckets
+        self.fixed_heights = fixed_heights
+        
+    @classmethod
+    def read(cls, input_file: Path) -> 'MappedBounds':
+        with open(input_file, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+            
+        view = memoryview(buffer)
+        
+        # A truncated or corrupt file fails while parsing, the map must not stay open then
+        try:
+            f = BinaryReader(view)
+            
+            magic = read_binary_name(f, 4)
+            offset = Vector3.read(f, '<')
+            x_dim, y_dim, z_dim = read_unpack(f, '<3l')
+            center = Vector3.read(f, '<')
+            radius, radius_sqr = read_unpack(f, '<2f')
+            bb_min = Vector3.read(f, '<')
+            bb_max = Vector3.read(f, '<')
+            num_verts, num_polys, num_hot_verts_1, num_hot_verts_2, num_edges = read_unpack(f, '<5l')
+            x_scale, z_scale, num_indices, height_scale, cache_size = read_unpack(f, '<2flfl')
+            
+            header = (
+                magic, offset, x_dim, y_dim, z_dim, center, radius, radius_sqr, bb_min, bb_max, 
+                num_verts, num_polys, num_hot_verts_1, num_hot_verts_2, num_edges, 
+                x_scale, z_scale, num_indices, height_scale, cache_size
+                )
+            
+            vertices = f.read_array('<f4', num_verts * 3).reshape(-1, 3)
+            polys = f.read_array(Polygon.DTYPE, num_polys + 1)
+            
+            hot_verts = f.read_array('<f4', num_hot_verts_2 * 3).reshape(-1, 3)
+            edge_verts_1 = f.read_array('<u4', num_edges)
+            edge_verts_2 = f.read_array('<u4', num_edges)
+            edge_plane_normal = f.read_array('<f4', num_edges * 3).reshape(-1, 3)
+            edge_plane_distance = f.read_array('<f4', num_edges)
+            
+            row_offsets = None
+            bucket_offsets = None
+            row_buckets = None
+            fixed_heights = None
+            
+            if x_dim and y_dim and z_dim:
+                row_offsets = f.read_array('<u4', z_dim)
+                bucket_offsets = f.read_array('<u2', x_dim * z_dim)
+                row_buckets = f.read_array('<u2', num_indices)
+                fixed_heights = f.read_array('u1', x_dim * z_dim)
+            
+            return cls(
+                buffer, view, header, vertices, polys, 
+                hot_verts, edge_verts_1, edge_verts_2, edge_plane_normal, edge_plane_distance, 
+                row_offsets, bucket_offsets, row_buckets, fixed_heights
+                )
+        except Exception:
+            cls.close_buffer(buffer, view)
+            raise
+        
+    @staticmethod
+    def close_buffer(buffer: mmap.mmap, view: memoryview) -> None:
+        view.release()
+        
+        try:
+            buffer.close()
+        except BufferError:
+            # The traceback of the error being raised still holds some arrays into the map, 
+            # it is closed once they are freed instead, so that error is not hidden
+            pass
+        
+    def close(self) -> None:
+        # The arrays are views into the map, they have to be released before it can be closed
+        self.vertices = self.polys = self.hot_verts = None
+        self.edge_verts_1 = self.edge_verts_2 = self.edge_plane_normal = self.edge_plane_distance = None
+        self.row_offsets = self.bucket_offsets = self.row_buckets = self.fixed_heights = None
+        self.close_buffer(self.buffer, self.view)
+        
+    def iter_polys(self, chunk_size: int = 4096) -> Iterator[str]:
+        for start in range(0, len(self.polys), chunk_size):
+            chunk = self.polys[start:start + chunk_size]
+            columns = [chunk[name].tolist() for name in Polygon.DTYPE.names]
+            
+            # Only the corners of the polygons in this chunk are formatted
+            corners = self.vertices[chunk['vertex_index']].tolist()
+            
+            for (cell_id, material_index, flags, vertex_index, plane_edges, normal, distance), poly_corners in zip(zip(*columns), corners):
+                vertices_coordinates = ', '.join(Vector3.format(*corner) for corner in poly_corners)
+                edges = ', '.join(Vector3.format(*edge) for edge in plane_edges)
+                yield f"""
+POLYGON
+    Cell ID: {cell_id}
+    Material Index: {material_index}
+    Flags: {flags}
+    Vertex Indices: {tuple(vertex_index)}
+    Vertices Coordinates: [{vertices_coordinates}]
+    Plane Edges: [{edges}]
+    Plane N: {Vector3.format(*normal)}
+    Plane D: {distance}
     """
+            
+    def dump(self, f: TextIO) -> None:
+        f.write(f"""
+BOUND
+    Magic: {self.magic}
+    Offset: {self.offset}
+    X Dim: {self.x_dim}
+    Y Dim: {self.y_dim}
+    Z Dim: {self.z_dim}
+    Center: {self.center}
+    Radius: {self.radius:.2f}
+    Radius Sqr: {self.radius_sqr:.2f}
+    BB Min: {self.bb_min}
+    BB Max: {self.bb_max}
+    Num Verts: {self.num_verts}
+    Num Polys: {self.num_polys}
+    Num Hot Verts 1: {self.num_hot_verts_1}
+    Num Hot Verts 2: {self.num_hot_verts_2}
+    Num Edges: {self.num_edges}
+    X Scale: {self.x_scale:.5f}
+    Z Scale: {self.z_scale:.5f}
+    Num Indices: {self.num_indices}
+    Height Scale: {self.height_scale:.5f}
+    Cache Size: {self.cache_size}\n
+    Vertices:
+    [""")
+        write_joined(f, Vector3.format_array(self.vertices))
+        f.write("""]\n
+    ======= Polys =======
+    """)
+        write_joined(f, self.iter_polys(), "\n")
+        f.write("""\n
+    ======= Split =======\n
+    Hot Verts: [""")
+        write_joined(f, Vector3.format_array(self.hot_verts))
+        f.write("]\n    Edge Verts 1: ")
+        Bounds.write_values(f, self.edge_verts_1)
+        f.write("\n    Edge Verts 2: ")
+        Bounds.write_values(f, self.edge_verts_2)
+        f.write("\n    Edge Plane N: [")
+        write_joined(f, Vector3.format_array(self.edge_plane_normal))
+        f.write("]\n    Edge Plane D: ")
+        distances = self.edge_plane_distance
+        write_joined(f, (f'{d:.2f}' for start in range(0, len(distances), 4096) for d in distances[start:start + 4096].tolist()))
+        
+        for name, values in (("Row Offsets", self.row_offsets), ("Bucket Offsets", self.bucket_offsets), 
+                             ("Row Buckets", self.row_buckets), ("Fixed Heights", self.fixed_heights)):
+            f.write(f"\n\n    ======= Split =======\n\n    {name}: ")
+            Bounds.write_values(f, values)
+            
+        f.write("\n\n    ")
+        
+    def __repr__(self) -> str:
+        buffer = io.StringIO()
+        self.dump(buffer)
+        return buffer.getvalue()
     
 ################################################################################################################               
 ################################################################################################################  
@@ -1410,30 +2490,29 @@ class Meshes:
         
     @classmethod
     def read(cls, input_file: Path) -> 'Meshes':
-        with open(input_file, "rb") as f:
-            magic = read_binary_name(f, 16)
-            vertex_count, adjunct_count, surface_count, indices_count = read_unpack(f, '<4I')
-            radius, radius_sqr, bounding_box_radius = read_unpack(f, '<3f')
-            texture_count, flags = read_unpack(f, '<2B')
-            
-            f.read(2)  # Padding
-            cache_size, = read_unpack(f, '<I')
-                                      
-            texture_names = [read_binary_name(f, 32, 'ascii', 16) for _ in range(texture_count)]
-            
-            if vertex_count < Threshold.MESH_VERTEX_COUNT:
-                vertices = Vector3.readn(f, vertex_count, '<')
-            else:
-                vertices = Vector3.readn(f, vertex_count + 8, '<')
-                                        
-            normals = list(read_unpack(f, f"{adjunct_count}B"))
-            tex_coords = list(read_unpack(f, f"{adjunct_count * 2}f"))
-            enclosed_shape = list(read_unpack(f, f"{adjunct_count}H"))
-            surface_sides = list(read_unpack(f, f"{surface_count}B"))
-            
-            indices_per_surface = indices_count // surface_count
-            indices_sides = [list(read_unpack(f, f"<{indices_per_surface}H")) for _ in range(surface_count)]
-            
+        f = BinaryReader.open(input_file)
+        
+        magic = read_binary_name(f, 16)
+        vertex_count, adjunct_count, surface_count, indices_count = read_unpack(f, '<4I')
+        radius, radius_sqr, bounding_box_radius = read_unpack(f, '<3f')
+        texture_count, flags, cache_size = read_unpack(f, '<2B2xI')  # Two bytes of padding
+                                  
+        texture_names = [read_binary_name(f, 32, 'ascii', 16) for _ in range(texture_count)]
+        
+        if vertex_count < Threshold.MESH_VERTEX_COUNT:
+            vertices = Vector3.readn(f, vertex_count, '<')
+        else:
+            vertices = Vector3.readn(f, vertex_count + 8, '<')
+                                    
+        normals = list(read_unpack(f, f"{adjunct_count}B"))
+        tex_coords = list(read_unpack(f, f"{adjunct_count * 2}f"))
+        enclosed_shape = list(read_unpack(f, f"{adjunct_count}H"))
+        surface_sides = list(read_unpack(f, f"{surface_count}B"))
+        
+        indices_per_surface = indices_count // surface_count
+        indices = read_unpack(f, f"<{indices_per_surface * surface_count}H")
+        indices_sides = [list(indices[i:i + indices_per_surface]) for i in range(0, len(indices), indices_per_surface)]
+        
         return cls(
             magic, vertex_count, adjunct_count, surface_count, indices_count, 
             radius, radius_sqr, bounding_box_radius, 
@@ -1448,20 +2527,15 @@ class Meshes:
             write_binary_name(f, self.magic, 16) 
             write_pack(f, '<4I', self.vertex_count, self.adjunct_count, self.surface_count, self.indices_count)
             write_pack(f, '<3f', self.radius, self.radius_sqr, self.bounding_box_radius)
-            write_pack(f, '<2B', self.texture_count, self.flags)
-            
-            f.write(b'\0' * 2)  # Padding
-            write_pack(f, '<I', self.cache_size)
+            write_pack(f, '<2B2xI', self.texture_count, self.flags, self.cache_size)  # Two bytes of padding
             
             for texture_name in self.texture_names:
                 write_binary_name(f, texture_name, length = 32, padding = 16) 
                             
-            for vertex in self.vertices:
-                vertex.write(f, '<')
+            Vector3.writen(f, self.vertices[:self.vertex_count], '<')
 
             if self.vertex_count >= Threshold.MESH_VERTEX_COUNT:
-                for _ in range(8):
-                    Default.VECTOR_3.write(f, '<')
+                Vector3.writen(f, [Default.VECTOR_3] * 8, '<')
                                                                         
             write_pack(f, f"{self.adjunct_count}B", *self.normals)
                         
@@ -1477,7 +2551,9 @@ class Meshes:
             for indices_side in self.indices_sides:
                 while len(indices_side) == Shape.TRIANGLE:
                     indices_side.append(0)
-                write_pack(f, f"{len(indices_side)}H", *indices_side)
+                    
+            indices = [index for indices_side in self.indices_sides for index in indices_side]
+            write_pack(f, f"{len(indices)}H", *indices)
 
     @staticmethod       
     def align_size(value: int) -> int:
@@ -1516,8 +2592,8 @@ class Meshes:
             print(f"The output folder {debug_folder} does not exist. Creating it.")
             debug_folder.mkdir(parents = True, exist_ok = True)
 
-        with open(debug_folder / output_file, "w") as f:
-            f.write(str(self))
+        with open(debug_folder / output_file, "w", buffering = 1024 * 1024) as f:
+            self.dump(f)
             
     @classmethod
     def debug_file(cls, input_file: Path, output_file: Path, debug_meshes_file: bool) -> None:
@@ -1531,32 +2607,24 @@ class Meshes:
             print(f"The output folder {output_file.parent} does not exist. Creating it.")
             output_file.parent.mkdir(parents = True, exist_ok = True)
 
-        with open(output_file, "w") as out_f:
-            out_f.write(str(cls.read(input_file)))
+        with open(output_file, "w", buffering = 1024 * 1024) as out_f:
+            cls.read(input_file).dump(out_f)
                 
     @classmethod
     def debug_folder(cls, input_folder: Path, output_folder: Path, debug_meshes_folder: bool) -> None:
         if not debug_meshes_folder:
             return
         
-        if not input_folder.exists():
-            raise FileNotFoundError(f"The folder {input_folder} does not exist.")
-
-        mesh_files = list(input_folder.glob("*.BMS"))
-        
-        if not mesh_files:
-            raise FileNotFoundError(f"No .BMS files found in {input_folder}.")
-            
-        if not output_folder.exists():
-            print(f"The output folder {output_folder} does not exist. Creating it.")
-            output_folder.mkdir(parents = True, exist_ok = True)
-
-        for file in mesh_files:
-            output_file = output_folder / file.with_suffix('.txt').name
-            cls.debug_file(file, output_file, debug_meshes_folder)
+        BatchConverter(partial(cls.debug_file, debug_meshes_file = True)).run(input_folder, output_folder, "*.BMS")
                                 
-    def __repr__(self) -> str:
-        return f"""
+    @staticmethod
+    def dump_list(f: TextIO, values: Iterable[Any]) -> None:
+        f.write("[")
+        write_joined(f, map(repr, values))
+        f.write("]")
+        
+    def dump(self, f: TextIO) -> None:
+        f.write(f"""
 MESH
     Magic: {self.magic}
     Vertex Count: {self.vertex_count}
@@ -1569,14 +2637,26 @@ MESH
     Texture Count: {self.texture_count}
     Flags: {self.flags}
     Cache Size: {self.cache_size}\n
-    Texture Names: {self.texture_names}\n
-    Vertices: {self.vertices}\n
-    Normals: {self.normals}\n
-    Tex Coords: {', '.join(f'{coord:.2f}' for coord in self.tex_coords)}\n
-    Enclosed Shape: {self.enclosed_shape}\n
-    Surface Sides: {self.surface_sides}\n
-    Indices Sides: {self.indices_sides}\n
-    """
+    Texture Names: """)
+        self.dump_list(f, self.texture_names)
+        f.write("\n\n    Vertices: ")
+        self.dump_list(f, self.vertices)
+        f.write("\n\n    Normals: ")
+        self.dump_list(f, self.normals)
+        f.write("\n\n    Tex Coords: ")
+        write_joined(f, (f'{coord:.2f}' for coord in self.tex_coords))
+        f.write("\n\n    Enclosed Shape: ")
+        self.dump_list(f, self.enclosed_shape)
+        f.write("\n\n    Surface Sides: ")
+        self.dump_list(f, self.surface_sides)
+        f.write("\n\n    Indices Sides: ")
+        self.dump_list(f, self.indices_sides)
+        f.write("\n\n    ")
+        
+    def __repr__(self) -> str:
+        buffer = io.StringIO()
+        self.dump(buffer)
+        return buffer.getvalue()
              
 ################################################################################################################               
 ################################################################################################################   
@@ -1584,6 +2664,13 @@ MESH
 
 
 class DLPVertex: 
+    DTYPE = np.dtype([
+        ('id', '>u2'), 
+        ('normal', '>f4', (3,)), 
+        ('uv', '>f4', (2,)), 
+        ('color', '>u4')
+        ])
+    
     def __init__(self, id: int, normal: Vector3, uv: Vector2, color: int) -> None:
         self.id = id
         self.normal = normal
@@ -1592,31 +2679,54 @@ class DLPVertex:
         
     @classmethod
     def read(cls, f: BinaryIO) -> 'DLPVertex':
-        id, = read_unpack(f, '>H')
-        normal = Vector3.read(f, '>')
-        uv = Vector2.read(f, '>')
-        color, = read_unpack(f, '>I')       
-        return cls(id, normal, uv, color)
+        id, normal_x, normal_y, normal_z, u, v, color = read_unpack(f, '>H5fI')
+        return cls(id, Vector3(normal_x, normal_y, normal_z), Vector2(u, v), color)
+    
+    @classmethod
+    def read_n(cls, f: BinaryReader, count: int) -> np.ndarray:
+        return f.read_array(cls.DTYPE, count)
     
     def write(self, f: BinaryIO) -> None:
-        write_pack(f, '>H', self.id)
-        self.normal.write(f, '>')    
-        self.uv.write(f, '>')       
-        write_pack(f, '>I', self.color)
-           
-    def __repr__(self) -> str:
+        write_pack(f, '>H5fI', self.id, self.normal.x, self.normal.y, self.normal.z, self.uv.x, self.uv.y, self.color)
+        
+    @classmethod
+    def to_array(cls, vertices: Union[np.ndarray, List['DLPVertex']]) -> np.ndarray:
+        if isinstance(vertices, np.ndarray):
+            return vertices.astype(cls.DTYPE, copy = False)
+        
+        return np.array([
+            (vertex.id, vertex.normal.to_tuple(), vertex.uv.tuple(), vertex.color) 
+            for vertex in vertices], dtype = cls.DTYPE)
+        
+    @classmethod
+    def write_n(cls, f: BinaryIO, vertices: Union[np.ndarray, List['DLPVertex']]) -> None:
+        f.write(cls.to_array(vertices).tobytes())
+        
+    @staticmethod
+    def format(id: int, normal: Tuple[float, float, float], uv: Tuple[float, float], color: int) -> str:
         return f"""
-            Id: {self.id}
-            Normal: {self.normal}
-            UV: {self.uv}
-            Color: {self.color}
+            Id: {id}
+            Normal: {Vector3.format(*normal)}
+            UV: {Vector2.format(*uv)}
+            Color: {color}
             """
+            
+    @classmethod
+    def format_n(cls, vertices: Union[np.ndarray, List['DLPVertex']]) -> str:
+        if not isinstance(vertices, np.ndarray):
+            return str(vertices)
+        
+        columns = [vertices[name].tolist() for name in cls.DTYPE.names]
+        return "[" + ", ".join(cls.format(*values) for values in zip(*columns)) + "]"
+           
+    def __repr__(self) -> str:
+        return DLPVertex.format(self.id, self.normal.to_tuple(), self.uv.tuple(), self.color)
     
             
 class DLPPatch:
     def __init__(self, s_res: int, t_res: int, flags: int, r_opts: int, 
                  material_index: int, texture_index: int, physics_index: int, 
-                 vertices: List[DLPVertex], name: str) -> None:
+                 vertices: Union[np.ndarray, List[DLPVertex]], name: str) -> None:
         
         self.s_res = s_res
         self.t_res = t_res
@@ -1629,22 +2739,18 @@ class DLPPatch:
         self.name = name
         
     @classmethod
-    def read(cls, f: BinaryIO) -> 'DLPPatch':
-        s_res, t_res = read_unpack(f, '>2H')
-        flags, r_opts = read_unpack(f, '>2H')
-        material_index, texture_index, physics_index = read_unpack(f, '>3H')        
-        vertices = [DLPVertex.read(f) for _ in range(s_res * t_res)]
+    def read(cls, f: BinaryReader) -> 'DLPPatch':
+        s_res, t_res, flags, r_opts, material_index, texture_index, physics_index = read_unpack(f, '>7H')
+        vertices = DLPVertex.read_n(f, s_res * t_res)
         name_length, = read_unpack(f, '>I')
         name = read_binary_name(f, name_length)
         return cls(s_res, t_res, flags, r_opts, material_index, texture_index, physics_index, vertices, name)
     
     def write(self, f: BinaryIO) -> None:
-        write_pack(f, '>2H', self.s_res, self.t_res) 
-        write_pack(f, '>2H', self.flags, self.r_opts)
-        write_pack(f, '>3H', self.material_index, self.texture_index, self.physics_index)
+        write_pack(f, '>7H', self.s_res, self.t_res, self.flags, self.r_opts, 
+                   self.material_index, self.texture_index, self.physics_index)
         
-        for vertex in self.vertices:
-            vertex.write(f)
+        DLPVertex.write_n(f, self.vertices)
             
         write_pack(f, '>I', len(self.name))        
         write_binary_name(f, self.name)
@@ -1660,13 +2766,13 @@ class DLPPatch:
         Texture Index: {self.texture_index}
         Physics Index: {self.physics_index}
         Name: {self.name}
-        Vertex: {self.vertices}
+        Vertex: {DLPVertex.format_n(self.vertices)}
         """
 
 
 class DLPGroup:
     def __init__(self, name: str, num_vertices: int, num_patches: int, 
-                 vertex_indices: tuple[int, ...], patch_indices: tuple[int, ...]) -> None:
+                 vertex_indices: Union[np.ndarray, List[int]], patch_indices: Union[np.ndarray, List[int]]) -> None:
         
         self.name = name
         self.num_vertices = num_vertices
@@ -1675,20 +2781,32 @@ class DLPGroup:
         self.patch_indices = patch_indices
         
     @classmethod
-    def read(cls, f: BinaryIO) -> 'DLPGroup':
+    def read(cls, f: BinaryReader) -> 'DLPGroup':
         name_length, = read_unpack(f, '>B')
         name = read_binary_name(f, name_length)        
         num_vertices, num_patches = read_unpack(f, '>2I')        
-        vertex_indices = [read_unpack(f, '>H')[0] for _ in range(num_vertices)]
-        patch_indices = [read_unpack(f, '>H')[0] for _ in range(num_patches)]     
+        vertex_indices = f.read_array('>u2', num_vertices)
+        patch_indices = f.read_array('>u2', num_patches)
         return cls(name, num_vertices, num_patches, vertex_indices, patch_indices)
 
     def write(self, f: BinaryIO) -> None:
         write_pack(f, '>B', len(self.name))
         write_binary_name(f, self.name)        
         write_pack(f, '>2I', self.num_vertices, self.num_patches)
-        write_pack(f, f'>{self.num_vertices}H', *self.vertex_indices)
-        write_pack(f, f'>{self.num_patches}H', *self.patch_indices)
+        f.write(DLPGroup.pack_indices(self.vertex_indices, self.num_vertices))
+        f.write(DLPGroup.pack_indices(self.patch_indices, self.num_patches))
+        
+    @staticmethod
+    def pack_indices(indices: Union[np.ndarray, List[int]], count: int) -> bytes:
+        indices = np.asarray(indices, dtype = '>u2')
+        
+        if len(indices) != count:
+            raise ValueError(f"""
+            ***ERROR***
+            Expected {count} DLP group indices, got {len(indices)}.
+            """)
+            
+        return indices.tobytes()
         
     def __repr__(self) -> str:
         return f"""
@@ -1696,14 +2814,14 @@ class DLPGroup:
         Name: {self.name}
         Num Vertices: {self.num_vertices}
         Num Patches: {self.num_patches}
-        Vertex Indices: {self.vertex_indices}
-        Patch Indices: {self.patch_indices}
+        Vertex Indices: {np.asarray(self.vertex_indices, dtype = np.int64).tolist()}
+        Patch Indices: {np.asarray(self.patch_indices, dtype = np.int64).tolist()}
         """
 
 
 class DLP:
     def __init__(self, magic: str, num_groups: int, num_patches: int, num_vertices: int, 
-                 groups: List[DLPGroup], patches: List[DLPPatch], vertices: List[Vector3]) -> None:
+                 groups: List[DLPGroup], patches: List[DLPPatch], vertices: Union[np.ndarray, List[Vector3]]) -> None:
         
         self.magic = magic
         self.num_groups = num_groups
@@ -1715,11 +2833,13 @@ class DLP:
         
     @classmethod
     def read(cls, f: BinaryIO) -> 'DLP':
+        f = BinaryReader.wrap(f)
+        
         magic = read_binary_name(f, 4)          
         num_groups, num_patches, num_vertices = read_unpack(f, '>3I')
         groups = [DLPGroup.read(f) for _ in range(num_groups)]
         patches = [DLPPatch.read(f) for _ in range(num_patches)]
-        vertices = Vector3.readn(f, num_vertices, '>')
+        vertices = f.read_array('>f4', num_vertices * 3).reshape(-1, 3)
         return cls(magic, num_groups, num_patches, num_vertices, groups, patches, vertices)
 
     def write(self, output_file: str, set_dlp: bool) -> None:
@@ -1736,8 +2856,21 @@ class DLP:
             for patch in self.patches:
                 patch.write(f)    
 
-            for vertex in self.vertices: 
-                vertex.write(f, '>') 
+            DLP.write_vertices(f, self.vertices)
+            
+    @staticmethod
+    def write_vertices(f: BinaryIO, vertices: Union[np.ndarray, List[Vector3]]) -> None:
+        if isinstance(vertices, np.ndarray):
+            f.write(vertices.astype('>f4', copy = False).tobytes())
+        else:
+            Vector3.writen(f, vertices, '>')
+            
+    @staticmethod
+    def format_vertices(vertices: Union[np.ndarray, List[Vector3]]) -> str:
+        if not isinstance(vertices, np.ndarray):
+            return str(vertices)
+        
+        return "[" + ", ".join(Vector3.format(x, y, z) for x, y, z in vertices.tolist()) + "]"
                                     
     @staticmethod          
     def debug_file(input_file: Path, output_file: Path, debug_dlp_file: bool) -> None:
@@ -1764,23 +2897,7 @@ class DLP:
         if not debug_dlp_folder:
             return
         
-        if not input_folder.exists():
-            raise FileNotFoundError(f"The folder {input_folder} does not exist.")
-
-        dlp_files = list(input_folder.glob("*.DLP"))
-        
-        if not dlp_files:
-            raise FileNotFoundError(f"No .DLP files found in {input_folder}.")
-        
-        if not output_folder.exists():
-            print(f"The output folder {output_folder} does not exist. Creating it.")
-            output_folder.mkdir(parents = True, exist_ok = True)
-
-        for file in dlp_files:
-            output_file = output_folder / file.with_suffix(".txt").name
-            DLP.debug_file(file, output_file, debug_dlp_folder)     
-
-            print(f"Processed {file.name} to {output_file.name}")    
+        BatchConverter(partial(DLP.debug_file, debug_dlp_file = True)).run(input_folder, output_folder, "*.DLP")
                                                         
     def __repr__(self) -> str:
         return f"""
@@ -1792,7 +2909,7 @@ DLP
     {self.groups}\n
     {self.patches}\n
     Vertices: 
-        {self.vertices}
+        {DLP.format_vertices(self.vertices)}
     """
             
 ################################################################################################################               
@@ -1865,7 +2982,10 @@ def sort_coordinates(vertex_coordinates: List[Vector3]) -> List[Vector3]:
 def read_binary_name(f, length: int = None, encoding: str = "ascii", padding: int = 0) -> str:
     name_data = bytearray()
     
-    if length is None:
+    if length is None and isinstance(f, BinaryReader):
+        return f.read_cstring(encoding)
+    
+    elif length is None:
         while True:
             char = f.read(1)
             if char == b"\0" or not char:
@@ -1898,6 +3018,54 @@ def write_binary_name(f, name: str, length: int = None, encoding: str = "ascii",
     
     if padding > 0:
         f.write(b"\0" * padding)
+        
+        
+def read_binary_file(read: Callable[[BinaryIO], Any], input_file: Path) -> Any:
+    with open(input_file, "rb") as f:
+        return read(f)
+    
+    
+def get_cache_file(input_file: Path, cache_folder: Path = Folder.USER_RESOURCES / "CACHE") -> Path:
+    source_key = hashlib.sha1(str(input_file.resolve()).encode("utf-8")).hexdigest()[:16]
+    return cache_folder / f"{input_file.stem}_{source_key}.pkl"
+
+
+def load_cached(input_file: Path, load: Callable[[Path], Any], use_cache: bool = use_resource_cache) -> Any:
+    if not use_cache:
+        return load(input_file)
+    
+    source_stat = input_file.stat()
+    cache_file = get_cache_file(input_file)
+    
+    # The cached copy is only valid for the exact same source file, size and modification time
+    if cache_file.exists():
+        try:
+            with open(cache_file, "rb") as f:
+                cached = pickle.load(f)
+                
+            if (cached["source"], cached["size"], cached["mtime_ns"]) == (str(input_file.resolve()), source_stat.st_size, source_stat.st_mtime_ns):
+                return cached["data"]
+            
+        except Exception:
+            pass  # Rebuild the cache if it is corrupted or was written by an older version (or under another module name) of the Editor
+        
+    data = load(input_file)
+    
+    try:
+        cache_file.parent.mkdir(parents = True, exist_ok = True)
+        
+        with open(cache_file, "wb") as f:
+            pickle.dump({
+                "source": str(input_file.resolve()), 
+                "size": source_stat.st_size, 
+                "mtime_ns": source_stat.st_mtime_ns, 
+                "data": data
+                }, f, protocol = pickle.HIGHEST_PROTOCOL)
+            
+    except (OSError, pickle.PicklingError):
+        pass  # A missing cache only costs parse time
+    
+    return data
 
 
 def transform_coordinate_system(vertex: Vector3, blender_to_game: bool = False, game_to_blender: bool = False) -> Tuple[float, float, float]:
@@ -1995,15 +3163,36 @@ def determine_mesh_folder_and_filename(cell_id: int, texture_name: List[str]) ->
            
 def save_mesh(
     texture_name: str, texture_indices: List[int] = [1], 
-    vertices: List[Vector3] = vertices, polys: List[Polygon] = polys, 
+    vertices: VertexBuffer = vertices, polys: PolygonTable = polys, 
     normals: List[int] = None, tex_coords: List[float] = None, 
     randomize_textures: bool = randomize_textures, random_textures: List[str] = random_textures, 
-    debug_meshes: bool = debug_meshes) -> None:
+    debug_meshes: bool = debug_meshes, cell_registry: CellRegistry = cell_registry) -> None:
             
     poly = polys[-1]  # Get the last polygon added
+    save_polygon_mesh(poly, texture_name, texture_indices, vertices, normals, tex_coords, 
+                      randomize_textures, random_textures, debug_meshes, cell_registry)
+    
+    
+def save_meshes(
+    texture_name: str, first_row: int, count: int, texture_indices: List[int] = [1], 
+    vertices: VertexBuffer = vertices, polys: PolygonTable = polys, 
+    randomize_textures: bool = randomize_textures, random_textures: List[str] = random_textures, 
+    debug_meshes: bool = debug_meshes, cell_registry: CellRegistry = cell_registry) -> None:
+    
+    # Batch version of save_mesh() for the polygons added by create_polygons(), one mesh per polygon
+    for row in range(first_row, first_row + count):
+        save_polygon_mesh(polys[row], texture_name, texture_indices, vertices, None, None, 
+                          randomize_textures, random_textures, debug_meshes, cell_registry)
+        
+        
+def save_polygon_mesh(
+    poly: Polygon, texture_name: str, texture_indices: List[int], vertices: VertexBuffer, 
+    normals: List[int], tex_coords: List[float], randomize_textures: bool, random_textures: List[str], 
+    debug_meshes: bool, cell_registry: CellRegistry) -> None:
     
     cell_id = poly.cell_id
     target_folder, mesh_filename = determine_mesh_folder_and_filename(cell_id, texture_name)
+    cell_registry.add_mesh(cell_id, LevelOfDetail.DRIFT if mesh_filename.endswith("_A2.bms") else LevelOfDetail.HIGH)
     
     if randomize_textures:
         texture_name = [random.choice(random_textures)] 
@@ -2018,15 +3207,15 @@ def save_mesh(
 
 
 def initialize_mesh(
-    vertices: List[Vector3], polys: List[Polygon], texture_indices: List[int], 
+    vertices: VertexBuffer, polys: List[Polygon], texture_indices: List[int], 
     texture_name: List[str], normals: List[int] = None, tex_coords: List[float] = None) -> Meshes:
     
     magic = Magic.MESH    
     flags = agiMeshSet.TEXCOORDS_AND_NORMALS
     cache_size = 0
        
-    shapes = [[vertices[i] for i in poly.vertex_index] for poly in polys] 
-    coordinates = [coord for shape in shapes for coord in shape]
+    shapes = [vertices.array[poly.vertex_index] for poly in polys] 
+    coordinates = [Vector3(*coord) for shape in shapes for coord in shape.tolist()]
         
     radius = calculate_radius(coordinates, Default.VECTOR_3)  # Use Local Offset for the Center (this is not the case for the Bound files)
     radiussq = calculate_radius_squared(coordinates, Default.VECTOR_3)
@@ -2119,6 +3308,67 @@ def compute_plane_edgenormals(vertex_1: Vector3, vertex_2: Vector3, vertex_3: Ve
     return plane_normal, plane_distance
 
 
+def row_dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Same summation as np.dot on a single row, so batched results match the per-polygon functions bit for bit
+    return np.matmul(a[:, None, :], b[:, :, None])[:, 0, 0]
+
+
+def compute_normals(corners: np.ndarray) -> np.ndarray:
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    return normals / np.sqrt(row_dot(normals, normals))[:, None]
+
+
+def ensure_ccw_orders(triangles: np.ndarray) -> np.ndarray:
+    clockwise = compute_normals(triangles)[:, 1] < 0
+    
+    triangles = triangles.copy()
+    triangles[clockwise, 1:] = triangles[clockwise, :0:-1]
+    return triangles
+
+
+def compute_plane_normals(corners: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    plane_normals = compute_normals(corners)
+    plane_distances = -row_dot(plane_normals, corners[:, 0])
+    return np.round(plane_normals, 3), np.round(plane_distances, 3)
+
+
+def compute_plane_edges(corners: np.ndarray) -> np.ndarray:
+    num_polys, num_verts = corners.shape[:2]
+    
+    vertices = corners.copy()
+    vertices[..., 1] = 0.0
+    
+    # Projected onto the XZ plane the normal is either (0, +-1, 0) or undefined for vertical polygons
+    projected_normals = np.round(compute_normals(vertices), 3)
+    along_y = ~np.isnan(projected_normals[:, 1])
+    negate = np.where(along_y & (projected_normals[:, 1] > 0.0), -1.0, 1.0)[:, None]
+    
+    A = vertices
+    D = np.roll(vertices, -1, axis = 1) - A
+    
+    # Vertical polygons fall through to the X axis branch of compute_edges()
+    second_axis = np.where(along_y[:, None], D[..., 0], D[..., 1])
+    second_offset = np.where(along_y[:, None], A[..., 0], A[..., 1])
+    
+    edge_x = -D[..., 2] * negate
+    edge_y = second_axis * negate
+    edge_d = -row_dot(
+        np.stack([-D[..., 2], second_axis], axis = -1).reshape(-1, 2), 
+        np.stack([second_offset, A[..., 2]], axis = -1).reshape(-1, 2)
+        ).reshape(num_polys, num_verts)
+    
+    edges = np.stack([edge_x, edge_y], axis = -1).reshape(-1, 2)
+    norm_values = np.sqrt(row_dot(edges, edges)).reshape(num_polys, num_verts)
+    
+    # All shapes must always have 4 vectors
+    plane_edges = np.zeros((num_polys, Shape.QUAD, 3))
+    plane_edges[:, :num_verts, 0] = edge_x / norm_values
+    plane_edges[:, :num_verts, 1] = edge_y / norm_values
+    plane_edges[:, :num_verts, 2] = edge_d / norm_values
+    
+    return plane_edges
+
+
 def compute_edges(vertex_coordinates: List[Vector3]) -> List[Vector3]:
     vertices = [np.array([vertex[0], 0, vertex[2]]) for vertex in vertex_coordinates]
     plane_normal, _ = compute_plane_edgenormals(*vertices[:3]) 
@@ -2179,22 +3429,19 @@ def compute_edges(vertex_coordinates: List[Vector3]) -> List[Vector3]:
 #! ======================= CREATE POLYGON ======================= !#
 
 
-def check_bound_numbers(polys: List[Polygon]) -> None:
-    found_one = False
+def check_bound_numbers(polys: PolygonTable) -> None:
+    cell_ids = polys.column('cell_id')[1:]  # Skip the filler Polygon with Bound Number 0 
+    invalid = (cell_ids <= 0) | (cell_ids == Threshold.CELL_TYPE_SWITCH) | (cell_ids >= Threshold.VERTEX_INDEX_COUNT)
     
-    for poly in polys[1:]:  # Skip the filler Polygon with Bound Number 0 
-        if poly.cell_id <= 0 or poly.cell_id == Threshold.CELL_TYPE_SWITCH or poly.cell_id >= Threshold.VERTEX_INDEX_COUNT:
-            error_message = f"""
-            ***ERROR***
-            - Polygon with "bound_number =  {poly.cell_id}" is not valid. 
-            - Bound Number must be between 1 and 199, and 201 and 32766.
-            """
-            raise ValueError(error_message)
-        
-        if poly.cell_id == 1:
-            found_one = True
+    if invalid.any():
+        error_message = f"""
+        ***ERROR***
+        - Polygon with "bound_number =  {cell_ids[invalid][0]}" is not valid. 
+        - Bound Number must be between 1 and 199, and 201 and 32766.
+        """
+        raise ValueError(error_message)
 
-    if not found_one:
+    if not (cell_ids == 1).any():
         error_message = f"""
         ***ERROR***
         - There must be at least one Polygon with Bound Number 1 (this was not found).
@@ -2253,11 +3500,9 @@ def create_polygon(
     material_index: int = 0, cell_type: int = 0, flags: int = None, 
     plane_edges: List[Vector3] = None, wall_side: str = None, sort_vertices: bool = False,
     hud_color: str = Color.ROAD, minimap_outline_color: str = minimap_outline_color, 
-    always_visible: bool = True, fix_faulty_quads: bool = fix_faulty_quads, base: bool = False) -> None:
+    always_visible: bool = True, fix_faulty_quads: bool = fix_faulty_quads, base: bool = False, 
+    cell_registry: CellRegistry = cell_registry) -> None:
 
-    # Vertex indices
-    base_vertex_index = len(vertices)
-    
     # Store the Polygon Data for Blender (before any manipulation)
     polygon_info = {
         "vertex_coordinates": vertex_coordinates,
@@ -2325,10 +3570,7 @@ def create_polygon(
         plane_normal = Vector3(*plane_normal)
         
     # Finalize Polygon
-    new_vertices = [Vector3(*coord) for coord in vertex_coordinates]
-    vertices.extend(new_vertices)
-    
-    vertex_indices = [base_vertex_index + i for i in range(len(new_vertices))]
+    vertex_indices = vertices.add(vertex_coordinates).tolist()
             
     poly = Polygon(
         bound_number, material_index, flags, vertex_indices, 
@@ -2337,12 +3579,111 @@ def create_polygon(
         )
     
     polys.append(poly)
+    cell_registry.add_polygon(bound_number, cell_type, always_visible)
         
-    # Save HUD data
+    # Save HUD data (the HUD vertices are a view over the Polygon Table and Vertex Buffer)
     hud_fill = hud_color is not None
-    hudmap_vertices.append(vertex_coordinates)
     hudmap_properties[len(hudmap_vertices) - 1] = (hud_fill, hud_color, minimap_outline_color, str(bound_number))
     
+    
+def create_polygons(
+    bound_numbers: Union[int, np.ndarray], texture_name: List[str], triangles: np.ndarray = None, quads: np.ndarray = None, 
+    material_index: Union[int, np.ndarray] = 0, cell_type: Union[int, np.ndarray] = 0, 
+    always_visible: Union[bool, np.ndarray] = True, flags: int = None,
+    hud_color: str = Color.ROAD, minimap_outline_color: str = minimap_outline_color, 
+    fix_faulty_quads: bool = fix_faulty_quads, cell_registry: CellRegistry = cell_registry) -> None:
+    
+    # Batch version of create_polygon() and save_mesh() for generated geometry: "triangles" is (N, 3, 3), "quads" is (M, 4, 3) 
+    # Per-polygon values (bound numbers, material index, ...) are either one value or N + M values, triangles first
+    # Every polygon gets its own mesh with "texture_name", so the textures stay in step with the Blender polygon data
+    shapes = []
+    
+    for shape_coordinates, num_verts in ((triangles, Shape.TRIANGLE), (quads, Shape.QUAD)):
+        if shape_coordinates is None:
+            continue
+        
+        shape_coordinates = np.asarray(shape_coordinates, dtype = np.float64)
+        
+        if shape_coordinates.ndim != 3 or shape_coordinates.shape[1:] != (num_verts, 3):
+            error_message = f"""
+            ***ERROR***
+            Expected an array of shape (N, {num_verts}, 3), got {shape_coordinates.shape}.
+            You must set 3 vertex coordinates per triangle and 4 vertex coordinates per quad.
+            """
+            raise ValueError(error_message)
+        
+        if len(shape_coordinates):
+            shapes.append((shape_coordinates, num_verts))
+        
+    num_polys = sum(len(shape_coordinates) for shape_coordinates, _ in shapes)
+    
+    if num_polys == 0:
+        return
+    
+    bound_numbers = np.broadcast_to(np.asarray(bound_numbers), (num_polys,))
+    material_index = np.broadcast_to(np.asarray(material_index), (num_polys,))
+    cell_type = np.broadcast_to(np.asarray(cell_type), (num_polys,))
+    always_visible = np.broadcast_to(np.asarray(always_visible), (num_polys,))
+    
+    cell_registry.add_polygons(bound_numbers.tolist(), cell_type.tolist(), always_visible.tolist())
+    
+    row = 0
+    
+    for shape_coordinates, num_verts in shapes:
+        count = len(shape_coordinates)
+        
+        # Store the Polygon Data for Blender (before any manipulation)
+        for i, coordinates in enumerate(shape_coordinates.tolist(), start = row):
+            polygons_data.append({
+                "vertex_coordinates": [tuple(coordinate) for coordinate in coordinates],
+                "bound_number": int(bound_numbers[i]),
+                "material_index": int(material_index[i]),
+                "always_visible": bool(always_visible[i]),
+                "sort_vertices": False,
+                "cell_type": int(cell_type[i]),
+                "hud_color": hud_color
+            })
+        
+        # Winding & Flags
+        if num_verts == Shape.TRIANGLE:
+            shape_coordinates = ensure_ccw_orders(shape_coordinates)
+            shape_flags = PlaneEdgesWinding.TRIANGLE_Z_AXIS if flags is None else flags
+            
+        else:
+            if fix_faulty_quads:
+                shape_coordinates = np.array([ensure_quad_ccw_order(quad) for quad in shape_coordinates.tolist()])
+                
+            shape_flags = PlaneEdgesWinding.QUAD_Z_AXIS if flags is None else flags
+            
+        plane_normals, plane_distances = compute_plane_normals(shape_coordinates)
+        
+        vertex_index = np.zeros((count, Shape.QUAD), dtype = np.int64)
+        vertex_index[:, :num_verts] = vertices.add(shape_coordinates.reshape(-1, 3)).reshape(count, num_verts)
+        
+        base_poly_index = len(polys)
+        
+        polys.extend({
+            'cell_id': bound_numbers[row:row + count],
+            'material_index': material_index[row:row + count],
+            'flags': shape_flags,
+            'cell_type': cell_type[row:row + count],
+            'always_visible': always_visible[row:row + count],
+            'vertex_count': num_verts,
+            'vertex_index': vertex_index,
+            'plane_edges': compute_plane_edges(shape_coordinates),
+            'plane_normal': plane_normals,
+            'plane_distance': plane_distances,
+            })
+        
+        # Save HUD data
+        hud_fill = hud_color is not None
+        
+        for i, bound_number in enumerate(bound_numbers[row:row + count].tolist()):
+            hudmap_properties[base_poly_index + i - 1] = (hud_fill, hud_color, minimap_outline_color, str(bound_number))
+            
+        save_meshes(texture_name, base_poly_index, count, cell_registry = cell_registry)
+        row += count
+    
 ################################################################################################################               
 ################################################################################################################  
 #! =======================CREATING YOUR MAP======================= !#
@@ -3403,79 +4744,107 @@ def check_row_size(max_warning_count: int, max_error_count: int) -> None:
         raise ValueError(error_message)
 
 
-def get_cell_ids(landmark_folder: Path, city_folder: Path) -> Tuple[List[int], Set[int]]:
-    meshes_regular = []
-    meshes_water_drift = set()
-
-    files = [file for folder in [landmark_folder, city_folder] for file in folder.iterdir()]
+def get_visible_cells(always_visible_cell_ids: List[int], cell_id: int, cell_pvs: Optional[Dict[int, Set[int]]]) -> List[int]:
+    if cell_pvs is None:
+        return always_visible_cell_ids
     
-    for file in files:
-        cell_id = int(re.findall(r'\d+', file.name)[0])
+    # The Room, and cells without a potentially visible set, stay visible from every cell
+    return [visible_id for visible_id in always_visible_cell_ids 
+            if visible_id == Default.ROOM or visible_id not in cell_pvs or cell_id in cell_pvs[visible_id]]
 
-        if file.name.endswith("_A2.bms"):
-            meshes_water_drift.add(cell_id)
 
-        if file.name.endswith(".bms"):
-            meshes_regular.append(cell_id)
-            
-    return meshes_regular, meshes_water_drift
+def write_cell_row(cell_id: int, model: int, cell_type: int, always_visible_data: str) -> str:       
+    return f"{cell_id},{model},{cell_type}{always_visible_data}\n"
 
 
-def get_cell_visiblity(polys: List[Polygon]) -> List[int]:
-    always_visible_cell_ids = [poly.cell_id for poly in polys if poly.always_visible]
+def get_cell_footprints(polys: PolygonTable, vertices: VertexBuffer) -> Dict[int, Tuple[float, float, float, int]]:
+    num_verts = polys.num_verts()
+    corners = np.arange(Shape.QUAD)
     
-    if Default.ROOM not in always_visible_cell_ids:
-        always_visible_cell_ids.insert(0, Default.ROOM)
-        
-    return always_visible_cell_ids
-
-
-def get_cell_type(cell_id: int, polys: List[Polygon]) -> int:  
-    for poly in polys:
-        if poly.cell_id == cell_id:
-            return poly.cell_type
-    return Room.DEFAULT
-
+    # Top-down (X, Z) corners, the unused fourth corner of a triangle repeats the first one
+    in_shape = corners[None, :] < num_verts[:, None]
+    vertex_index = np.where(in_shape, polys.column('vertex_index'), polys.column('vertex_index')[:, :1])
+    points = vertices.array[vertex_index][:, :, [0, 2]]
+    next_points = np.roll(points, -1, axis = 1)
+    
+    areas = np.abs(np.sum((points[:, :, 0] * next_points[:, :, 1]) - (next_points[:, :, 0] * points[:, :, 1]), axis = 1)) * 0.5
+    centers = np.sum(points * in_shape[:, :, None], axis = 1) / num_verts[:, None]
+    
+    cell_ids, inverse, polygon_counts = np.unique(polys.column('cell_id'), return_inverse = True, return_counts = True)
+    center_x = np.bincount(inverse, weights = centers[:, 0]) / polygon_counts
+    center_z = np.bincount(inverse, weights = centers[:, 1]) / polygon_counts
+    cell_areas = np.bincount(inverse, weights = areas)
+    
+    return {cell_id: (x, z, area, count) for cell_id, x, z, area, count in 
+            zip(cell_ids.tolist(), center_x.tolist(), center_z.tolist(), cell_areas.tolist(), polygon_counts.tolist())}
 
-def write_cell_row(cell_id: int, cell_type: int, always_visible_data: str, mesh_a2_files: Set[int]) -> str:       
-    model = LevelOfDetail.DRIFT if cell_id in mesh_a2_files else LevelOfDetail.HIGH
-    return f"{cell_id},{model},{cell_type}{always_visible_data}\n"
 
+def get_visibility_score(visible_id: int, cell_id: int, cell_footprints: Dict[int, Tuple[float, float, float, int]]) -> float:
+    if visible_id == Default.ROOM:
+        return math.inf
+    
+    if visible_id not in cell_footprints:
+        return 0.0
+    
+    x, z, area, polygon_count = cell_footprints[visible_id]
+    origin_x, origin_z, _, _ = cell_footprints.get(cell_id, (x, z, 0.0, 0))
+    distance2 = ((x - origin_x) ** 2) + ((z - origin_z) ** 2)
+    
+    # Large, detailed cells close to this cell cover the most of the screen
+    return (area * (1 + math.log2(polygon_count))) / max(distance2, 1.0)
 
-def truncate_always_visible(always_visible_cell_ids: List[int], cell_id: int, cell_type: int, mesh_a2_files: Set[int]) -> Tuple[str, int]:
-    always_visible_count = len(always_visible_cell_ids)
-    always_visible_data = f",{always_visible_count},{','.join(map(str, always_visible_cell_ids))}"
-    cell_row = write_cell_row(cell_id, cell_type, always_visible_data, mesh_a2_files)
 
-    while len(cell_row) >= Threshold.CELL_CHARACTER_LIMIT:
-        always_visible_cell_ids.pop()
-        always_visible_count = len(always_visible_cell_ids)
-        always_visible_data = f",{always_visible_count},{','.join(map(str, always_visible_cell_ids))}"
-        cell_row = write_cell_row(cell_id, cell_type, always_visible_data, mesh_a2_files)
+def truncate_always_visible(always_visible_cell_ids: List[int], cell_id: int, model: int, cell_type: int, 
+                            cell_footprints: Dict[int, Tuple[float, float, float, int]], character_costs: Dict[int, int]) -> Tuple[str, int]:
+    
+    # Every id costs its digits plus a comma, the count may not grow past the digits of the full list
+    row_length = len(write_cell_row(cell_id, model, cell_type, f",{len(always_visible_cell_ids)}"))
+    budget = Threshold.CELL_CHARACTER_LIMIT - 1 - row_length
+    
+    ranked = sorted(always_visible_cell_ids, reverse = True, 
+                    key = lambda visible_id: get_visibility_score(visible_id, cell_id, cell_footprints) / character_costs[visible_id])
+    kept = set()
+    
+    for visible_id in ranked:
+        if character_costs[visible_id] <= budget:
+            kept.add(visible_id)
+            budget -= character_costs[visible_id]
+            
+    kept_cell_ids = [visible_id for visible_id in always_visible_cell_ids if visible_id in kept]
+    always_visible_data = f",{len(kept_cell_ids)},{','.join(map(str, kept_cell_ids))}" if kept_cell_ids else ",0"
+    cell_row = write_cell_row(cell_id, model, cell_type, always_visible_data)
         
     return cell_row, len(cell_row) 
         
         
-def create_cells(output_file: Path, polys: List[Polygon], truncate_cells: bool) -> None:
-    mesh_files, mesh_a2_files = get_cell_ids(Folder.SHOP_MESH_LANDMARK, Folder.SHOP_MESH_CITY)
+def create_cells(output_file: Path, polys: PolygonTable, vertices: VertexBuffer, truncate_cells: bool, 
+                 cell_pvs: Optional[Dict[int, Set[int]]] = None, cell_registry: CellRegistry = cell_registry) -> None:
+    mesh_cells = cell_registry.mesh_cells()
 
     with open(output_file, "w") as f:    
-        f.write(f"{len(mesh_files)}\n")
-        f.write(str(max(mesh_files) + 1000) + "\n")
+        f.write(f"{len(mesh_cells)}\n")
+        f.write(str(max(mesh_cells) + 1000) + "\n")
 
-        always_visible_cell_ids = get_cell_visiblity(polys)
-        always_visible_cell_count = len(always_visible_cell_ids)
+        always_visible_cell_ids = cell_registry.get_always_visible()
+        
+        # Rows that stay too long after the potentially visible set are truncated as well
+        truncate_cells = truncate_cells or cell_pvs is not None
+        cell_footprints = get_cell_footprints(polys, vertices) if truncate_cells else {}
+        character_costs = {visible_id: len(str(visible_id)) + 1 for visible_id in always_visible_cell_ids}
 
         max_warning_count = max_error_count = 0
 
-        for cell_id in sorted(mesh_files):
-            cell_type = get_cell_type(cell_id, polys)
-            always_visible_data = ",0" if always_visible_cell_count == 0 else f",{always_visible_cell_count},{','.join(map(str, always_visible_cell_ids))}"
-            row = write_cell_row(cell_id, cell_type, always_visible_data, mesh_a2_files)
+        for cell_id in mesh_cells:
+            model = cell_registry.models[cell_id]
+            cell_type = cell_registry.get_cell_type(cell_id)
+            visible_cell_ids = get_visible_cells(always_visible_cell_ids, cell_id, cell_pvs)
+            visible_cell_count = len(visible_cell_ids)
+            always_visible_data = ",0" if visible_cell_count == 0 else f",{visible_cell_count},{','.join(map(str, visible_cell_ids))}"
+            row = write_cell_row(cell_id, model, cell_type, always_visible_data)
             row_length = len(row)
             
             if truncate_cells and row_length >= Threshold.CELL_CHARACTER_LIMIT:
-                row, row_length = truncate_always_visible(always_visible_cell_ids.copy(), cell_id, cell_type, mesh_a2_files)
+                row, row_length = truncate_always_visible(visible_cell_ids, cell_id, model, cell_type, cell_footprints, character_costs)
                     
             max_warning_count, max_error_count = update_max_counts(row_length, max_warning_count, max_error_count)
             
@@ -3742,6 +5111,9 @@ TANGENT_DIST_FUDGE = 0.1
 CORNER_FUDGE = 0.1
 LENGTH_FUDGE = 1
 STRICT_EDGES = False
+LINE_ANGLE_BUCKET = 0.05
+LINE_OFFSET_BUCKET = 1.0
+LINE_BUCKET_MIN_EDGES = 16
 
 if MERGE_COLINEAR:
     assert not STRICT_EDGES
@@ -3797,60 +5169,106 @@ class Cell:
     def __init__(self, id):
         self.id = id
         self.edges = []
+        self.line_buckets = {}
 
     def add_edge(self, v1, v2):
-        # Discard the Y (height) coordinate
-        v1 = Vector2(v1.x, v1.z)
-        v2 = Vector2(v2.x, v2.z)
+        self.edges.append(Edge(v1, v2))
 
-        if v1.Dist2(v2) < 0.00001:
+    def merge_colinear(self):
+        if len(self.edges) < 2:
             return
 
-        self.edges.append(Edge(v1, v2))
+        # Every edge joins the first earlier edge whose line it lies on, the lines are bucketed by angle and offset from the first vertex
+        origin = self.edges[0].v1
+        line_buckets = {}
+        lines = {}
 
-    def merge_colinear(self):
-        i = 0
+        for index, edge in enumerate(self.edges):
+            line = self.find_colinear_line(edge, origin, line_buckets)
+
+            if line is None:
+                angle, offset, _ = self.line_key(edge, origin)
+                line_buckets.setdefault((int(angle // LINE_ANGLE_BUCKET), int(offset // LINE_OFFSET_BUCKET)), []).append(index)
+                lines[index] = [index]
+            else:
+                lines[line].append(index)
+
+        merged = []
+
+        for line, indices in lines.items():
+            merged.extend(self.merge_line(line, indices))
+
+        self.edges = [edge for _, edge in sorted(merged, key = lambda item: item[0])]
 
-        while i < len(self.edges):
-            edge1 = self.edges[i]
+    # First line in "line_buckets" that both ends of "edge" lie on
+    def find_colinear_line(self, edge, origin, line_buckets):
+        spread = (2 * COLINEAR_FUDGE) / max(edge.length, 0.00001)
+        max_angle = min(math.asin(min(spread, 1)), math.acos(TANGENT_ANGLE_FUDGE)) * 1.01 + 0.00001
 
-            j = i + 1
+        angle, offset, _ = self.line_key(edge, origin)
+        distance = math.sqrt((origin - edge.v1).Mag2())
+        half_width = (distance * max_angle) + COLINEAR_FUDGE + 0.001
 
-            while j < len(self.edges):
-                edge2 = self.edges[j]
-                j += 1
+        lines = []
 
-                angle = (edge1.line.x * edge2.line.x) + (edge1.line.y * edge2.line.y)
+        for low, high, center in self.angle_ranges(angle, max_angle, offset):
+            for angle_bucket in range(int(low // LINE_ANGLE_BUCKET), int(high // LINE_ANGLE_BUCKET) + 1):
+                for offset_bucket in range(int((center - half_width) // LINE_OFFSET_BUCKET), int((center + half_width) // LINE_OFFSET_BUCKET) + 1):
+                    lines.extend(line_buckets.get((angle_bucket, offset_bucket), ()))
 
-                if abs(angle) < 0.999:
-                    continue
+        for index in sorted(lines):
+            line = self.edges[index]
 
-                v1p = edge1.tangent_dist(edge2.v1)
-                if abs(v1p) > COLINEAR_FUDGE:
-                    continue
+            if abs((line.line.x * edge.line.x) + (line.line.y * edge.line.y)) < TANGENT_ANGLE_FUDGE:
+                continue
+
+            if abs(line.tangent_dist(edge.v1)) > COLINEAR_FUDGE or abs(line.tangent_dist(edge.v2)) > COLINEAR_FUDGE:
+                continue
+
+            return index
+
+        return None
+
+    # Sweeps along one line and merges the overlapping edges, each merged edge is kept at the index of its first edge
+    def merge_line(self, line, indices):
+        base = self.edges[line]
+        spans = []
+
+        for index in indices:
+            edge = self.edges[index]
+
+            v1p = base.line_pos(edge.v1, base.tangent_dist(edge.v1))
+            v2p = base.line_pos(edge.v2, base.tangent_dist(edge.v2))
 
-                v2p = edge1.tangent_dist(edge2.v2)
-                if abs(v2p) > COLINEAR_FUDGE:
-                    continue
+            spans.append((min(v1p, v2p), max(v1p, v2p), index))
 
-                v1p = edge1.line_pos(edge2.v1, v1p)
-                v2p = edge1.line_pos(edge2.v2, v2p)
+        runs = []
 
-                v1p, v2p = min(v1p, v2p), max(v1p, v2p)
+        for v1p, v2p, index in sorted(spans):
+            if runs and (v2p >= runs[-1][0] + CORNER_FUDGE) and (v1p <= runs[-1][1] - CORNER_FUDGE):
+                runs[-1][1] = max(runs[-1][1], v2p)
+                runs[-1][2].append(index)
+            else:
+                runs.append([v1p, v2p, [index]])
+
+        merged = []
 
-                if (v2p < edge1.v1p + CORNER_FUDGE) or (v1p > edge1.v2p - CORNER_FUDGE):
-                    continue
+        for _, _, run in runs:
+            first = min(run)
+            edge = self.edges[first]
 
-                edge1.v1p = min(edge1.v1p, v1p)
-                edge1.v2p = max(edge1.v2p, v2p)
+            if len(run) > 1:
+                positions = [edge.line_pos(point, edge.tangent_dist(point)) for index in run if index != first for point in (self.edges[index].v1, self.edges[index].v2)]
 
-                edge1.v1 = edge1.pos_to_point(edge1.v1p)
-                edge1.v2 = edge1.pos_to_point(edge1.v2p)
+                edge.v1p = min(edge.v1p, *positions)
+                edge.v2p = max(edge.v2p, *positions)
 
-                del self.edges[j - 1]
-                j = i + 1
+                edge.v1 = edge.pos_to_point(edge.v1p)
+                edge.v2 = edge.pos_to_point(edge.v2p)
 
-            i += 1
+            merged.append((first, edge))
+
+        return merged
 
     def process(self):
         if MERGE_COLINEAR:
@@ -3872,86 +5290,329 @@ class Cell:
         self.center = (self.bb_min + self.bb_max) * 0.5
         self.radius = (self.bb_min.Dist(self.bb_max) * 0.5)
 
+        self.bucket_lines()
+        self.geometry_hash = self.hash_edges()
+
+    # Portals only depend on the merged edges of both cells, so equal hashes give equal portals
+    def hash_edges(self):
+        values = [(edge.v1.x, edge.v1.y, edge.v2.x, edge.v2.y, edge.v1p, edge.v2p, edge.line.x, edge.line.y, edge.line.z) for edge in self.edges]
+        return hashlib.sha1(np.array(values, dtype = np.float64).tobytes()).hexdigest()
+
+    # Angle of the line normal in [0, pi) and the signed distance from "origin" (the cell center by default) to the line
+    def line_key(self, edge, origin = None):
+        angle = math.atan2(edge.line.y, edge.line.x)
+        sign = 1
+
+        if angle < 0:
+            angle += math.pi
+            sign = -1
+
+        if angle >= math.pi:
+            angle -= math.pi
+            sign = -sign
+
+        offset = edge.tangent_dist(self.center if origin is None else origin) * sign
+        return angle, offset, sign
+
+    # Angle ranges within max_angle of "angle", with the offset to search around in each.
+    # Past 0 or pi the normal flips, and so does the sign of the offset
+    @staticmethod
+    def angle_ranges(angle, max_angle, offset):
+        ranges = [(max(angle - max_angle, 0), min(angle + max_angle, math.pi), offset)]
+
+        if angle - max_angle < 0:
+            ranges.append((angle - max_angle + math.pi, math.pi, -offset))
+
+        if angle + max_angle >= math.pi:
+            ranges.append((0, angle + max_angle - math.pi, -offset))
+
+        return ranges
+
+    def bucket_lines(self):
+        self.line_buckets = {}
+
+        if len(self.edges) < LINE_BUCKET_MIN_EDGES:
+            return
+
+        for index, edge in enumerate(self.edges):
+            angle, offset, _ = self.line_key(edge)
+            key = (int(angle // LINE_ANGLE_BUCKET), int(offset // LINE_OFFSET_BUCKET))
+            self.line_buckets.setdefault(key, []).append(index)
+
+    # Indices of the edges whose line can pass within TANGENT_DIST_FUDGE of both ends of "other"
+    def find_line_edges(self, other):
+        all_edges = range(len(self.edges))
+
+        if len(self.edges) < LINE_BUCKET_MIN_EDGES:
+            return all_edges
+
+        # Both ends near the line bounds the angle between the lines, short edges can match at any angle
+        spread = (2 * TANGENT_DIST_FUDGE) / max(other.v2p - other.v1p, 0.00001)
+
+        if spread >= 0.5:
+            return all_edges
+
+        max_angle = math.asin(spread) * 1.01 + 0.00001
+
+        angle, _, sign = self.line_key(other)
+        to_center = self.center - other.v1
+        distance = math.sqrt(to_center.Mag2())
+
+        # Rotating the line by up to max_angle around "other.v1" moves its distance to the cell center by at most distance * max_angle
+        offset = ((to_center.x * other.line.x) + (to_center.y * other.line.y)) * sign
+        half_width = (distance * max_angle) + TANGENT_DIST_FUDGE + 0.001
+
+        angle_ranges = self.angle_ranges(angle, max_angle, offset)
+
+        num_buckets = sum(int(high // LINE_ANGLE_BUCKET) - int(low // LINE_ANGLE_BUCKET) + 1 for low, high, _ in angle_ranges)
+
+        if num_buckets * ((2 * half_width / LINE_OFFSET_BUCKET) + 2) > len(self.edges):
+            return all_edges
+
+        indices = []
+
+        for low, high, center in angle_ranges:
+            for angle_bucket in range(int(low // LINE_ANGLE_BUCKET), int(high // LINE_ANGLE_BUCKET) + 1):
+                for offset_bucket in range(int((center - half_width) // LINE_OFFSET_BUCKET), int((center + half_width) // LINE_OFFSET_BUCKET) + 1):
+                    indices.extend(self.line_buckets.get((angle_bucket, offset_bucket), ()))
+
+        return sorted(set(indices))
+
+    # Pairs of (own edge, other edge) that may lie on the same line, in the order of comparing every edge with every edge
+    def line_candidates(self, other):
+        if len(self.edges) < LINE_BUCKET_MIN_EDGES:
+            return [(index1, index2) for index1 in range(len(self.edges)) for index2 in range(len(other.edges))]
+
+        return sorted((index1, index2) for index2, edge2 in enumerate(other.edges) for index1 in self.find_line_edges(edge2))
+
     def check_radius(self, other, fudge):
         return self.center.Dist2(other.center) < (self.radius + other.radius + fudge) ** 2
     
 ################################################################################################################  
 
-def prepare_portals(polys: List[Polygon], vertices: List[Vector3]):
-    cells = {}
+MAX_GRID_CELLS_PER_CELL = 64
 
-    for poly in polys:
-        if poly.cell_id in cells: 
-            cell = cells[poly.cell_id]
-        else:
-            cell = Cell(poly.cell_id)
-            cells[poly.cell_id] = cell
 
-        for i in range(poly.num_verts):
-            j = (i + 1) % poly.num_verts
-            cell.add_edge(vertices[poly.vertex_index[i]], vertices[poly.vertex_index[j]]) 
+def find_cell_pairs(cells: List[Cell], fudge: float) -> List[Tuple[Cell, Cell]]:
+    # Uniform grid broadphase over the bounding circles of the cells, only cells that share a grid cell are compared.
+    # Returns the same pairs, in the same order, as comparing every pair of cells with check_radius
+    num_cells = len(cells)
+    
+    if num_cells < 2:
+        return []
+    
+    ids = np.array([cell.id for cell in cells])
+    centers = np.array([(cell.center.x, cell.center.y) for cell in cells], dtype = np.float64)
+    reach = np.array([cell.radius for cell in cells], dtype = np.float64) + fudge * 0.5 + 0.001
+    
+    grid_size = max(float(np.median(reach)) * 2, 0.001)
+    
+    grid_min = np.floor((centers - reach[:, None]) / grid_size).astype(np.int64)
+    grid_max = np.floor((centers + reach[:, None]) / grid_size).astype(np.int64)
+    grid_span = grid_max - grid_min + 1
+    
+    # Cells that cover too many grid cells (e.g. cells without edges) are compared against every other cell
+    large = grid_span.astype(np.float64).prod(axis = 1) > MAX_GRID_CELLS_PER_CELL
+    small = np.nonzero(~large)[0]
+    
+    counts = grid_span[small, 0] * grid_span[small, 1]
+    entry_cell = np.repeat(small, counts)
+    entry_offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    entry_x = grid_min[entry_cell, 0] + entry_offset % grid_span[entry_cell, 0]
+    entry_y = grid_min[entry_cell, 1] + entry_offset // grid_span[entry_cell, 0]
+    
+    order = np.lexsort((entry_cell, entry_y, entry_x))
+    entry_cell, entry_x, entry_y = entry_cell[order], entry_x[order], entry_y[order]
+    
+    # Pair every entry with the entries after it in the same grid cell
+    group_start = np.r_[True, (entry_x[1:] != entry_x[:-1]) | (entry_y[1:] != entry_y[:-1])]
+    group_end = np.r_[np.nonzero(group_start)[0][1:], len(entry_cell)][np.cumsum(group_start) - 1]
+    
+    positions = np.arange(len(entry_cell))
+    num_pairs = group_end - positions - 1
+    first = np.repeat(positions, num_pairs)
+    second = first + 1 + np.arange(num_pairs.sum()) - np.repeat(np.cumsum(num_pairs) - num_pairs, num_pairs)
+    
+    large_cells = np.nonzero(large)[0]
+    pair_a = np.concatenate((entry_cell[first], np.repeat(large_cells, num_cells)))
+    pair_b = np.concatenate((entry_cell[second], np.tile(np.arange(num_cells), len(large_cells))))
+    
+    # Order each pair like the original loop (lowest cell id first), then by position of the cells
+    keep = pair_a != pair_b
+    pair_a, pair_b = pair_a[keep], pair_b[keep]
+    cell_1 = np.where(ids[pair_a] < ids[pair_b], pair_a, pair_b)
+    cell_2 = np.where(ids[pair_a] < ids[pair_b], pair_b, pair_a)
+    
+    pair_keys = np.unique(cell_1 * num_cells + cell_2)
+    
+    pairs = []
+    
+    for index_1, index_2 in zip((pair_keys // num_cells).tolist(), (pair_keys % num_cells).tolist()):
+        cell1, cell2 = cells[index_1], cells[index_2]
+        
+        if cell1.check_radius(cell2, fudge):
+            pairs.append((cell1, cell2))
+            
+    return pairs
+
 
-    for cell in cells.values():
-        cell.process()
+def find_portals(cell1, cell2):
+    portals = []
 
-    portals = set()
+    # Only edges on (nearly) the same line can touch, the original edge order is kept so the portals are found in the same order
+    for index1, index2 in cell1.line_candidates(cell2):
+        edge1 = cell1.edges[index1]
+        edge2 = cell2.edges[index2]
 
-    cell_vs_cell = 0
-    edge_vs_edge = 0
+        v1p = edge1.tangent_dist(edge2.v1)
+        if abs(v1p) > TANGENT_DIST_FUDGE:
+            continue
 
-    for cell1 in cells.values():
-        for cell2 in cells.values():
-            if cell1.id >= cell2.id:
-                continue
+        v2p = edge1.tangent_dist(edge2.v2)
+        if abs(v2p) > TANGENT_DIST_FUDGE:
+            continue
+
+        v1p = edge1.line_pos(edge2.v1, v1p)
+        v2p = edge1.line_pos(edge2.v2, v2p)
 
-            if not cell1.check_radius(cell2, RADIUS_FUDGE):
+        v1p, v2p = min(v1p, v2p), max(v1p, v2p)
+
+        # Check whether any parts of the two edges are touching
+        if (v2p < edge1.v1p + CORNER_FUDGE) or (v1p > edge1.v2p - CORNER_FUDGE):
+            continue
+
+        if STRICT_EDGES:
+            # Check whether these two edges match
+            if (abs((v1p - edge1.v1p)) > CORNER_FUDGE) or (abs(v2p - edge1.v2p) > CORNER_FUDGE):
+                continue
+        else:
+            if (v2p - v1p) < LENGTH_FUDGE:
                 continue
+            pass
 
-            cell_vs_cell += 1
+        v1p = max(edge1.v1p, v1p)
+        v2p = min(edge1.v2p, v2p)
 
-            for edge1 in cell1.edges:
-                for edge2 in cell2.edges:
-                    edge_vs_edge += 1
+        assert v1p < v2p
 
-                    v1p = edge1.tangent_dist(edge2.v1)
-                    if abs(v1p) > TANGENT_DIST_FUDGE:
-                        continue
+        # TODO: Preserve y-height
+        p1 = edge1.pos_to_point(v1p)
+        p2 = edge1.pos_to_point(v2p)
 
-                    v2p = edge1.tangent_dist(edge2.v2)
-                    if abs(v2p) > TANGENT_DIST_FUDGE:
-                        continue
+        portals.append((cell1.id, cell2.id, p1, p2))
 
-                    v1p = edge1.line_pos(edge2.v1, v1p)
-                    v2p = edge1.line_pos(edge2.v2, v2p)
+    return portals
 
-                    v1p, v2p = min(v1p, v2p), max(v1p, v2p)
 
-                    # Check whether any parts of the two edges are touching
-                    if (v2p < edge1.v1p + CORNER_FUDGE) or (v1p > edge1.v2p - CORNER_FUDGE):
-                        continue
+def find_portals_chunk(cell_pairs):
+    return [find_portals(cell1, cell2) for cell1, cell2 in cell_pairs]
+
 
-                    if STRICT_EDGES:
-                        # Check whether these two edges match
-                        if (abs((v1p - edge1.v1p)) > CORNER_FUDGE) or (abs(v2p - edge1.v2p) > CORNER_FUDGE):
-                            continue
-                    else:
-                        if (v2p - v1p) < LENGTH_FUDGE:
-                            continue
-                        pass
+PORTAL_CACHE_SETTINGS = (MERGE_COLINEAR, COLINEAR_FUDGE, TANGENT_ANGLE_FUDGE, RADIUS_FUDGE, TANGENT_DIST_FUDGE, CORNER_FUDGE, LENGTH_FUDGE, STRICT_EDGES)
 
-                    v1p = max(edge1.v1p, v1p)
-                    v2p = min(edge1.v2p, v2p)
 
-                    assert v1p < v2p
+def load_portal_cache(cache_file: Path) -> Dict[Tuple[int, int], Tuple[str, str, List[Tuple[float, float, float, float]]]]:
+    if not cache_file.exists():
+        return {}
+    
+    try:
+        with open(cache_file, "rb") as f:
+            cached = pickle.load(f)
+            
+        if cached["settings"] == PORTAL_CACHE_SETTINGS:
+            return cached["pairs"]
+        
+    except Exception:
+        pass  # Recreate all portals if the cache is corrupted or was written by an older version (or under another module name) of the Editor
+    
+    return {}
 
-                    # TODO: Preserve y-height
-                    p1 = edge1.pos_to_point(v1p)
-                    p2 = edge1.pos_to_point(v2p)
 
-                    portals.add((cell1.id, cell2.id, p1, p2))
-                    
+def save_portal_cache(cache_file: Path, pairs: Dict[Tuple[int, int], Tuple[str, str, List[Tuple[float, float, float, float]]]]) -> None:
+    try:
+        cache_file.parent.mkdir(parents = True, exist_ok = True)
+        
+        with open(cache_file, "wb") as f:
+            pickle.dump({"settings": PORTAL_CACHE_SETTINGS, "pairs": pairs}, f, protocol = pickle.HIGHEST_PROTOCOL)
+            
+    except (OSError, pickle.PicklingError):
+        pass  # A missing cache only costs the time to recreate the portals
+
+
+def get_portal_cache_file(portal_file: Path, use_cache: bool = use_portal_cache) -> Optional[Path]:
+    return Folder.USER_RESOURCES / "CACHE" / f"{portal_file.stem}_PORTALS.pkl" if use_cache else None
+
+
+def prepare_portals(polys: PolygonTable, vertices: VertexBuffer, workers: int = portal_workers, chunk_size: int = portal_chunk_size, 
+                    cache_file: Optional[Path] = None):
+    cell_ids = polys.column('cell_id')
+    cells = {cell_id: Cell(cell_id) for cell_id in dict.fromkeys(cell_ids.tolist())}
+    
+    # Discard the Y (height) coordinate
+    coordinates = vertices.array[:, [0, 2]]
+    
+    num_verts = polys.num_verts()
+    corners = np.arange(Shape.QUAD)
+    vertex_index = polys.column('vertex_index')
+    
+    in_shape = corners[None, :] < num_verts[:, None]
+    next_corner = (corners[None, :] + 1) % num_verts[:, None]
+    
+    v1 = coordinates[vertex_index[in_shape]]
+    v2 = coordinates[np.take_along_axis(vertex_index, next_corner, axis = 1)[in_shape]]
+    edge_cell_ids = np.repeat(cell_ids, num_verts)
+    
+    delta = v2 - v1
+    keep = ((delta[:, 0] * delta[:, 0]) + (delta[:, 1] * delta[:, 1])) >= 0.00001
+    
+    for cell_id, (x1, y1), (x2, y2) in zip(edge_cell_ids[keep].tolist(), v1[keep].tolist(), v2[keep].tolist()):
+        cells[cell_id].add_edge(Vector2(x1, y1), Vector2(x2, y2))
+
+    for cell in cells.values():
+        cell.process()
+
+    cell_pairs = find_cell_pairs(list(cells.values()), RADIUS_FUDGE)
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, chunk_size)
+
+    # Only pairs with a changed cell, or cells that just became neighbours, are recreated
+    cached_pairs = load_portal_cache(cache_file) if cache_file is not None else {}
+    pair_hashes = [(cell1.geometry_hash, cell2.geometry_hash) for cell1, cell2 in cell_pairs]
+    changed_pairs = [pair for pair, hashes in zip(cell_pairs, pair_hashes) if cached_pairs.get((pair[0].id, pair[1].id), (None, None))[:2] != hashes]
+
+    if workers == 1 or len(changed_pairs) <= chunk_size or not BatchConverter.can_fork():
+        changed_portals = [find_portals(cell1, cell2) for cell1, cell2 in changed_pairs]
+    else:
+        chunks = [changed_pairs[i:i + chunk_size] for i in range(0, len(changed_pairs), chunk_size)]
+
+        changed_portals = [portals for chunk in fork_map(find_portals_chunk, chunks, workers = workers) for portals in chunk]
+
+    for (cell1, cell2), found in zip(changed_pairs, changed_portals):
+        cached_pairs[(cell1.id, cell2.id)] = (cell1.geometry_hash, cell2.geometry_hash, [(p1.x, p1.y, p2.x, p2.y) for _, _, p1, p2 in found])
+
+    # The results follow the order of the cell pairs, so the portals are added to the set in the same order for any number of workers
+    portals = set()
+    current_pairs = {}
+
+    for (cell1, cell2), hashes in zip(cell_pairs, pair_hashes):
+        key = (cell1.id, cell2.id)
+        current_pairs[key] = cached_pairs[key]
+        portals.update((cell1.id, cell2.id, Vector2(x1, y1), Vector2(x2, y2)) for x1, y1, x2, y2 in cached_pairs[key][2])
+
+    if cache_file is not None:
+        print(f"Reused the portals of {len(cell_pairs) - len(changed_pairs)} of {len(cell_pairs)} neighbouring cell pairs")
+        save_portal_cache(cache_file, current_pairs)
+
     return cells, portals
 
+
+def find_all_portals(polys: PolygonTable, vertices: VertexBuffer, portal_file: Path, empty_portals: bool, 
+                     workers: int = portal_workers, use_cache: bool = use_portal_cache) -> Tuple[Dict[int, Cell], Set[Tuple[int, int, Vector2, Vector2]]]:
+    if empty_portals:
+        return {}, set()
+    
+    return prepare_portals(polys, vertices, workers, cache_file = get_portal_cache_file(portal_file, use_cache))
+
 #! ############ Code by 0x1F9F1 (Modified) // end ############ !# 
 
 ################################################################################################################               
@@ -3981,12 +5642,9 @@ class Portals:
         
     @classmethod
     def read(cls, f: BinaryIO) -> 'Portals':
-        flags, edge_count, = read_unpack(f, '<2B')
-        gap_2, = read_unpack(f, '<H')
-        cell_1, cell_2, = read_unpack(f, '<2H')  
-        height, = read_unpack(f, '<f')   
-        _min = Vector3.read(f, '<')
-        _max = Vector3.read(f, '<')
+        flags, edge_count, gap_2, cell_1, cell_2, height, *bounds = read_unpack(f, '<2BH2Hf6f')
+        _min = Vector3(*bounds[:3])
+        _max = Vector3(*bounds[3:])
         
         vertex_c = None
         if edge_count == Shape.TRIANGLE:
@@ -3996,16 +5654,23 @@ class Portals:
         
     @classmethod
     def read_all(cls, f: BinaryIO) -> 'List[Portals]':
+        f = BinaryReader.wrap(f)
         return [cls.read(f) for _ in range(cls.readn(f))]
     
     @classmethod
     def write_n(cls, f: BinaryIO, portals: 'List[Portals]') -> None:
         write_pack(f, '<I', Magic.PORTAL) 
         write_pack(f, '<I', len(portals))
+        
+    def write(self, f: BinaryIO) -> None:
+        write_pack(f, '<2BH2Hf6f', self.flags, self.edge_count, self.gap_2, self.cell_1, self.cell_2, self.height, 
+                   self._min.x, self._min.y, self._min.z, self._max.x, self._max.y, self._max.z)
+        
+        if self.edge_count == Shape.TRIANGLE:
+            self.vertex_c.write(f, '<')
                 
     @classmethod
-    def write_all(cls, output_file: Path,
-                  polys: List[Polygon], vertices: List[Vector3], 
+    def write_all(cls, output_file: Path, portal_tuples: Set[Tuple[int, int, Vector2, Vector2]], 
                   lower_portals: bool, empty_portals: bool, debug_portals: bool) -> None:    
             
         with open(output_file, "wb") as f:
@@ -4013,8 +5678,6 @@ class Portals:
                 pass
             
             else:
-                _, portal_tuples = prepare_portals(polys, vertices)
-                
                 portals = []
                 
                 cls.write_n(f, portal_tuples)
@@ -4030,12 +5693,8 @@ class Portals:
                     portal = Portals(flags, edge_count, gap_2, cell_1, cell_2, height, _min, _max)
                     portals.append(portal)
                     
-                    write_pack(f, '<2B', flags, edge_count)
-                    write_pack(f, '<H', gap_2)
-                    write_pack(f, '<2H', cell_2, cell_1)
-                    write_pack(f, '<f', height)
-                    _min.write(f, '<')
-                    _max.write(f, '<')
+                    write_pack(f, '<2BH2Hf6f', flags, edge_count, gap_2, cell_2, cell_1, height, 
+                               _min.x, _min.y, _min.z, _max.x, _max.y, _max.z)
                     
                 if debug_portals:  
                     cls.debug(portals, Folder.DEBUG_RESOURCES / "PORTALS" / f"{MAP_FILENAME}_PTL.txt")            
@@ -4091,6 +5750,206 @@ PORTAL
     {'Vertex C ' + str(self.vertex_c) if self.vertex_c is not None else ''}
     """
     
+################################################################################################################               
+################################################################################################################
+#! ======================= POTENTIALLY VISIBLE SET ======================= !#
+
+
+PVS_EPSILON = 0.001
+
+
+# Line (nx, ny, c) through two points, with a unit normal
+def pvs_line(ax: float, ay: float, bx: float, by: float) -> Optional[Tuple[float, float, float]]:
+    nx, ny = ay - by, bx - ax
+    length = math.hypot(nx, ny)
+    
+    if length < PVS_EPSILON:
+        return None
+    
+    nx, ny = nx / length, ny / length
+    return nx, ny, -((nx * ax) + (ny * ay))
+
+
+def pvs_side(line: Tuple[float, float, float], x: float, y: float) -> float:
+    return (line[0] * x) + (line[1] * y) + line[2]
+
+
+def pvs_point(window: Tuple[float, float, float, float], t: float) -> Tuple[float, float]:
+    ax, ay, bx, by = window
+    return ax + (bx - ax) * t, ay + (by - ay) * t
+
+
+# Part [t0, t1] of the window where pvs_side(line) >= threshold
+def clip_window(window: Tuple[float, float, float, float], t0: float, t1: float, 
+                line: Tuple[float, float, float], threshold: float) -> Optional[Tuple[float, float]]:
+    
+    da = pvs_side(line, window[0], window[1]) - threshold
+    db = pvs_side(line, window[2], window[3]) - threshold
+    
+    if da == db:
+        return (t0, t1) if da >= 0 else None
+    
+    t = da / (da - db)
+    
+    if db > da:
+        t0 = max(t0, t)
+    else:
+        t1 = min(t1, t)
+        
+    return (t0, t1) if t1 > t0 else None
+
+
+# Lines through an end of the source and an end of the pass window that keep the two on opposite sides.
+# Every line of sight through both windows stays on the side of the pass window
+def get_separators(source: Tuple[float, float, float, float], 
+                   passage: Tuple[float, float, float, float]) -> List[Tuple[float, float, float]]:
+    
+    source_points = ((source[0], source[1]), (source[2], source[3]))
+    pass_points = ((passage[0], passage[1]), (passage[2], passage[3]))
+    separators = []
+    
+    for s, s_other in (source_points, source_points[::-1]):
+        for p, p_other in (pass_points, pass_points[::-1]):
+            line = pvs_line(*s, *p)
+            
+            if line is None:
+                continue
+            
+            ds = pvs_side(line, *s_other)
+            dp = pvs_side(line, *p_other)
+            
+            if (ds > PVS_EPSILON and dp < -PVS_EPSILON) or (ds < -PVS_EPSILON and dp > PVS_EPSILON):
+                separators.append(line if dp > 0 else (-line[0], -line[1], -line[2]))
+                
+    return separators
+
+
+class PortalGraph:
+    def __init__(self, cells: Dict[int, Cell], portals: Set[Tuple[int, int, Vector2, Vector2]]) -> None:
+        # Every portal is stored as two one-way windows, window "i ^ 1" leads back through window "i"
+        self.windows = []
+        self.targets = []
+        self.exits = {}
+        
+        for cell_1, cell_2, v1, v2 in portals:
+            for cell_from, cell_to in ((cell_1, cell_2), (cell_2, cell_1)):
+                self.exits.setdefault(cell_from, []).append(len(self.windows))
+                self.windows.append((v1.x, v1.y, v2.x, v2.y))
+                self.targets.append(cell_to)
+                
+        self.fronts = [self.get_front(cells.get(self.targets[index ^ 1]), window) for index, window in enumerate(self.windows)]
+        
+    # Line of the window facing away from the cell it leaves, None when that cell lies on both sides of the line
+    @staticmethod
+    def get_front(cell: Optional[Cell], window: Tuple[float, float, float, float]) -> Optional[Tuple[float, float, float]]:
+        line = pvs_line(*window)
+        
+        if cell is None or line is None:
+            return None
+        
+        sides = [pvs_side(line, vert.x, vert.y) for edge in cell.edges for vert in (edge.v1, edge.v2)]
+        
+        if all(side < PVS_EPSILON for side in sides):
+            return line
+        
+        if all(side > -PVS_EPSILON for side in sides):
+            return -line[0], -line[1], -line[2]
+        
+        return None
+    
+    # Conservative set of cells visible from "source", seen from anywhere in the cell through a chain of portals.
+    # None when a line of sight passes through more than "max_depth" portals, the visible cells are unknown then
+    def find_visible_cells(self, source: int, max_depth: int = pvs_max_depth) -> Optional[Set[int]]:
+        visible = {source}
+        explored = {}
+        
+        for source_index in self.exits.get(source, ()):
+            source_window = self.windows[source_index]
+            visible.add(self.targets[source_index])
+            
+            stack = [(source_index, 0.0, 1.0, 1)]
+            
+            while stack:
+                pass_index, t0, t1, depth = stack.pop()
+                
+                passage = (*pvs_point(self.windows[pass_index], t0), *pvs_point(self.windows[pass_index], t1))
+                
+                clip_lines = [] if depth == 1 else [(line, -PVS_EPSILON) for line in get_separators(source_window, passage)]
+                
+                if self.fronts[pass_index] is not None:
+                    clip_lines.append((self.fronts[pass_index], PVS_EPSILON))
+                
+                for target_index in self.exits.get(self.targets[pass_index], ()):
+                    if target_index == pass_index ^ 1:
+                        continue
+                    
+                    window = self.windows[target_index]
+                    clipped = (0.0, 1.0)
+                    
+                    for line, threshold in clip_lines:
+                        clipped = clip_window(window, *clipped, line, threshold)
+                        
+                        if clipped is None:
+                            break
+                        
+                    if clipped is None:
+                        continue
+                    
+                    length = math.hypot(window[2] - window[0], window[3] - window[1]) * (clipped[1] - clipped[0])
+                    
+                    if length < PVS_EPSILON:
+                        continue
+                    
+                    # The next windows only depend on the source and this part of the window, so smaller parts reached 
+                    # through at least as many portals add nothing new
+                    seen = explored.setdefault((source_index, target_index), [])
+                    
+                    if any(start <= clipped[0] and clipped[1] <= end and seen_depth <= depth + 1 for start, end, seen_depth in seen):
+                        continue
+                    
+                    # Stopping here would hide the cells further down this line of sight
+                    if depth >= max_depth:
+                        return None
+                    
+                    seen.append((*clipped, depth + 1))
+                    visible.add(self.targets[target_index])
+                    stack.append((target_index, *clipped, depth + 1))
+                    
+        return visible
+    
+    def find_visible_cells_chunk(self, max_depth: int, sources: List[int]) -> List[Optional[Set[int]]]:
+        return [self.find_visible_cells(source, max_depth) for source in sources]
+    
+    
+def create_cell_pvs(cells: Dict[int, Cell], portals: Set[Tuple[int, int, Vector2, Vector2]], set_cell_pvs: bool, 
+                    workers: int = portal_workers, max_sources: int = pvs_max_sources, max_depth: int = pvs_max_depth, 
+                    cell_registry: CellRegistry = cell_registry) -> Optional[Dict[int, Set[int]]]:
+    
+    if not set_cell_pvs or not portals:
+        return None
+    
+    # Visibility goes both ways, so only the "always visible" cells are used as sources. 
+    # Cells past "max_sources", and cells that see through more than "max_depth" portals, 
+    # get no potentially visible set and stay visible from every cell
+    sources = [cell_id for cell_id in cell_registry.get_always_visible() if cell_id != Default.ROOM][:max_sources]
+    
+    if not sources:
+        return {}
+    
+    graph = PortalGraph(cells, portals)
+    
+    workers = workers or os.cpu_count() or 1
+    
+    if workers == 1 or len(sources) == 1 or not BatchConverter.can_fork():
+        visible_cells = [graph.find_visible_cells(source, max_depth) for source in sources]
+    else:
+        chunk_size = max(1, math.ceil(len(sources) / (workers * 4)))
+        chunks = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+        
+        visible_cells = [visible for chunk in fork_map(partial(graph.find_visible_cells_chunk, max_depth), chunks, workers = workers) for visible in chunk]
+            
+    return {source: visible for source, visible in zip(sources, visible_cells) if visible is not None}
+    
 ################################################################################################################               
 ################################################################################################################            
 #! ======================= BANGERS CLASS ======================= !#
@@ -4110,15 +5969,20 @@ class Bangers:
             
     @classmethod
     def read(cls, f: BinaryIO) -> 'Bangers':
-        room, flags = read_unpack(f, '<2H')
-        offset = Vector3.read(f, '<')
-        face = Vector3.read(f, '<')  
+        room, flags, *values = read_unpack(f, '<2H6f')
+        offset = Vector3(*values[:3])
+        face = Vector3(*values[3:])
         name = read_binary_name(f)
         return cls(room, flags, offset, face, name)
     
+    @classmethod
+    def iter_records(cls, data: bytes) -> Iterator['Bangers']:
+        for (room, flags, *values), name in iter_named_records(data, '<2H6f'):
+            yield cls(room, flags, Vector3(*values[:3]), Vector3(*values[3:]), name)
+    
     @classmethod
     def read_all(cls, f: BinaryIO) -> 'List[Bangers]':
-        return [cls.read(f) for _ in range(cls.readn(f))]
+        return list(cls.iter_records(f.read()))
     
     @classmethod
     def write_n(cls, f: BinaryIO, bangers: List['Bangers']) -> None:
@@ -4131,10 +5995,9 @@ class Bangers:
             cls.write_n(f, bangers)
         
             for banger in bangers:
-                write_pack(f, '<2H', Default.ROOM, PROP_COLLIDE_FLAG)  
-                banger.offset.write(f, '<')
-                banger.face.write(f, '<')
-                f.write(banger.name.encode('utf-8'))
+                write_pack(f, '<2H6f', Default.ROOM, PROP_COLLIDE_FLAG, 
+                           banger.offset.x, banger.offset.y, banger.offset.z, banger.face.x, banger.face.y, banger.face.z)
+                f.write(banger.name.rstrip("\x00").encode('utf-8') + b"\x00")
                     
             if debug_props:
                 cls.debug(Folder.DEBUG_RESOURCES / "PROPS" / f"{output_file}.txt", bangers)
@@ -4163,11 +6026,8 @@ class Bangers:
             print(f"The output folder {output_file.parent} does not exist. Creating it.")
             output_file.parent.mkdir(parents = True, exist_ok = True)
 
-        with open(input_file, 'rb') as in_f:
-            bangers = cls.read_all(in_f)
-
         with open(output_file, 'w') as out_f:
-            for banger in bangers:
+            for banger in cls.iter_records(input_file.read_bytes()):
                 out_f.write(repr(banger))
         print(f"Processed {input_file.name} to {output_file.name}")
         
@@ -4184,13 +6044,12 @@ class Bangers:
             print(f"The output folder {output_file.parent} does not exist. Creating it.")
             output_file.parent.mkdir(parents = True, exist_ok = True)
 
-        with open(input_file, 'rb') as in_f:
-            bangers = cls.read_all(in_f)
+        data = input_file.read_bytes()
 
         with open(output_file, 'w') as out_f:
-            out_f.write(f"{len(bangers)}\n")  # Count
+            out_f.write(f"{cls.readn(BinaryReader(data))}\n")  # Count
             
-            for banger in bangers:
+            for banger in cls.iter_records(data):
                 formatted_line = f"{banger.room},{banger.flags}," \
                                  f"{banger.offset.x:.2f},{banger.offset.y:.2f},{banger.offset.z:.2f}," \
                                  f"{banger.face.x:.2f},{banger.face.y:.2f},{banger.face.z:.2f}," \
@@ -4255,7 +6114,7 @@ class BangerEditor:
                 separator = prop.get('separator', 10.0)
             
                 if isinstance(separator, str) and separator.lower() in ["x", "y", "z"]:
-                    prop_dims = self.load_dimensions(Folder.EDITOR_RESOURCES / "PROPS" / "Prop Dimensions.txt").get(name, Vector3(1, 1, 1))
+                    prop_dims = load_cached(Folder.EDITOR_RESOURCES / "PROPS" / "Prop Dimensions.txt", self.load_dimensions).get(name, Vector3(1, 1, 1))
                     separator = getattr(prop_dims, separator.lower())
                 elif not isinstance(separator, (int, float)):
                     separator = 10.0
@@ -4273,8 +6132,7 @@ class BangerEditor:
         if not append_props:
             return
             
-        with open(input_props_f, "rb") as f:
-            original_props = Bangers.read_all(f)
+        original_props = load_cached(input_props_f, partial(read_binary_file, Bangers.read_all))
               
         self.props = original_props
         self.add_multiple(props_to_append)
@@ -4354,28 +6212,30 @@ class Facades:
 
     @classmethod
     def read(cls, f: BinaryIO) -> 'Facades':
-        room, flags = read_unpack(f, '<2H')
-        offset = Vector3.read(f, '<')
-        face = Vector3.read(f, '<')
-        sides = Vector3.read(f, '<')
-        scale, = read_unpack(f, '<f')
+        room, flags, *values = read_unpack(f, '<2H10f')
+        offset = Vector3(*values[0:3])
+        face = Vector3(*values[3:6])
+        sides = Vector3(*values[6:9])
+        scale = values[9]
         name = read_binary_name(f)
         return cls(room, flags, offset, face, sides, scale, name)
     
+    @classmethod
+    def iter_records(cls, data: bytes) -> Iterator['Facades']:
+        for (room, flags, *values), name in iter_named_records(data, '<2H10f'):
+            yield cls(room, flags, Vector3(*values[0:3]), Vector3(*values[3:6]), Vector3(*values[6:9]), values[9], name)
+    
     @classmethod
     def read_all(cls, f: BinaryIO) -> List['Facades']:
-        return [cls.read(f) for _ in range(cls.readn(f))]
+        return list(cls.iter_records(f.read()))
     
     @classmethod
     def write_n(cls, f: BinaryIO, facades: List['Facades']) -> None:
         return write_pack(f, '<I', len(facades))
         
     def write(self, f: BinaryIO) -> None: 
-        write_pack(f, '<2H', Default.ROOM, self.flags)  # Hardcode the Room value such that all Facades are visible in the game    
-        write_pack(f, '<3f', *self.offset)  
-        write_pack(f, '<3f', *self.face)
-        write_pack(f, '<3f', *self.sides)
-        write_pack(f, '<f', self.scale)
+        # Hardcode the Room value such that all Facades are visible in the game    
+        write_pack(f, '<2H10f', Default.ROOM, self.flags, *self.offset, *self.face, *self.sides, self.scale)
         write_binary_name(f, self.name, terminate = True) 
         
     @classmethod
@@ -4411,11 +6271,8 @@ class Facades:
             print(f"The output folder {output_file.parent} does not exist. Creating it.")
             output_file.parent.mkdir(parents = True, exist_ok = True)
 
-        with open(input_file, "rb") as in_f:
-            facades = cls.read_all(in_f)
-
         with open(output_file, "w") as out_f:
-            for facade in facades:
+            for facade in cls.iter_records(input_file.read_bytes()):
                 out_f.write(repr(facade))
         print(f"Processed {input_file.name} to {output_file.name}")
         
@@ -4456,7 +6313,7 @@ class FacadeEditor:
     @classmethod
     def process(cls, user_set_facades):
         axis_dict = {'x': 0, 'y': 1, 'z': 2}
-        scales = cls.read_scales(Folder.EDITOR_RESOURCES / "FACADES" / "FCD scales.txt")
+        scales = load_cached(Folder.EDITOR_RESOURCES / "FACADES" / "FCD scales.txt", cls.read_scales)
 
         facades = []
         for params in user_set_facades:
@@ -4522,24 +6379,22 @@ class PhysicsEditor:
     @staticmethod
     def read(f: BinaryIO) -> 'PhysicsEditor':
         name = read_binary_name(f, 32, 'latin-1')
-        friction, elasticity, drag = read_unpack(f, '>3f')
-        bump_height, bump_width, bump_depth, sink_depth = read_unpack(f, '>4f')
-        type, sound = read_unpack(f, '>2I')
-        velocity = Vector2.read(f, '>')
-        ptx_color = Vector3.read(f, '>')
+        friction, elasticity, drag, bump_height, bump_width, bump_depth, sink_depth, type, sound, *values = read_unpack(f, '>7f2I5f')
+        velocity = Vector2(*values[:2])
+        ptx_color = Vector3(*values[2:])
         return PhysicsEditor(name, friction, elasticity, drag, bump_height, bump_width, bump_depth, sink_depth, type, sound, velocity, ptx_color)
     
     @classmethod
     def read_all(cls, f: BinaryIO) -> List['PhysicsEditor']:
+        f = BinaryReader.wrap(f)
         return [cls.read(f) for _ in range(cls.readn(f))]
 
     def write(self, f: BinaryIO) -> None:        
         write_binary_name(f, self.name, length = 32, encoding = "latin-1", terminate = True)
-        write_pack(f, '>3f', self.friction, self.elasticity, self.drag)
-        write_pack(f, '>4f', self.bump_height, self.bump_width, self.bump_depth, self.sink_depth)
-        write_pack(f, '>2I', self.type, self.sound)
-        self.velocity.write(f, '>')
-        self.ptx_color.write(f, '>')
+        write_pack(f, '>7f2I5f', 
+                   self.friction, self.elasticity, self.drag, 
+                   self.bump_height, self.bump_width, self.bump_depth, self.sink_depth, self.type, self.sound, 
+                   self.velocity.x, self.velocity.y, self.ptx_color.x, self.ptx_color.y, self.ptx_color.z)
 
     @staticmethod
     def write_all(output_file: Path, custom_params: List['PhysicsEditor']) -> None:
@@ -4554,8 +6409,7 @@ class PhysicsEditor:
         if not set_physics:
             return
         
-        with open(input_file, "rb") as f:
-            original_data = cls.read_all(f)   
+        original_data = load_cached(input_file, partial(read_binary_file, cls.read_all))
              
         for phys_index, properties in user_set_properties.items():
             physics_obj = original_data[phys_index - 1]
@@ -4893,56 +6747,52 @@ class TextureSheet:
 #! ############ Code by 0x1F9F1 (Modified) // start ############ !#   
 
 class aiStreet:                  
-    def load(self, f: BinaryIO) -> None:
-        self.id, = read_unpack(f, '<H')
-        self.num_vertexes, = read_unpack(f, '<H')
-        self.num_lanes, = read_unpack(f, '<H')
-        self.num_sidewalks, = read_unpack(f, '<H')
-        self.stop_light_index, = read_unpack(f, '<H')
-        self.intersection_type, = read_unpack(f, '<H')
-        self.blocked, = read_unpack(f, '<H')
-        self.ped_blocked, = read_unpack(f, '<H')
-        self.divided, = read_unpack(f, '<H')
-        self.is_flat, = read_unpack(f, '<H')
-        self.has_bridge, = read_unpack(f, '<H')
-        self.alley, = read_unpack(f, '<H')
-        self.road_length, = read_unpack(f, '<f')
-        self.speed_limit, = read_unpack(f, '<f')
+    def load(self, f: BinaryReader) -> None:
+        (self.id, self.num_vertexes, self.num_lanes, self.num_sidewalks, 
+         self.stop_light_index, self.intersection_type, self.blocked, self.ped_blocked, 
+         self.divided, self.is_flat, self.has_bridge, self.alley, 
+         self.road_length, self.speed_limit) = read_unpack(f, '<12H2f')
         self.stop_light_name = read_binary_name(f, 32)
-        self.oncoming_path, = read_unpack(f, '<I')
-        self.edge_index, = read_unpack(f, '<I')
-        self.path_index, = read_unpack(f, '<I')
-        self.sub_section_offsets = read_unpack(f, f'<{self.num_vertexes * (self.num_lanes + self.num_sidewalks)}f')
-        self.center_offsets = read_unpack(f, f'<{self.num_vertexes}f')
+        self.oncoming_path, self.edge_index, self.path_index = read_unpack(f, '<3I')
+        self.sub_section_offsets = f.read_array('<f4', self.num_vertexes * (self.num_lanes + self.num_sidewalks))
+        self.center_offsets = f.read_array('<f4', self.num_vertexes)
         self.intersection_ids = read_unpack(f, '<2I')
-        self.lane_vertices = Vector3.readn(f, self.num_vertexes * (self.num_lanes + self.num_sidewalks))
+        self.lane_vertices = f.read_array('<f4', self.num_vertexes * (self.num_lanes + self.num_sidewalks) * 3).reshape(-1, 3)
 
         # Center / Dividing line between the two sides of the road
-        self.center_vertices = Vector3.readn(f, self.num_vertexes, '<')
-        self.vert_x_dirs = Vector3.readn(f, self.num_vertexes, '<')
-        self.normals = Vector3.readn(f, self.num_vertexes, '<')
-        self.vert_z_dirs = Vector3.readn(f, self.num_vertexes, '<')
-        self.sub_section_dirs = Vector3.readn(f, self.num_vertexes, '<')
+        self.center_vertices = f.read_array('<f4', self.num_vertexes * 3).reshape(-1, 3)
+        self.vert_x_dirs = f.read_array('<f4', self.num_vertexes * 3).reshape(-1, 3)
+        self.normals = f.read_array('<f4', self.num_vertexes * 3).reshape(-1, 3)
+        self.vert_z_dirs = f.read_array('<f4', self.num_vertexes * 3).reshape(-1, 3)
+        self.sub_section_dirs = f.read_array('<f4', self.num_vertexes * 3).reshape(-1, 3)
 
         # Outer Edges, Inner Edges (Curb)
-        self.boundaries = Vector3.readn(f, self.num_vertexes * 2, '<')
+        self.boundaries = f.read_array('<f4', self.num_vertexes * 2 * 3).reshape(-1, 3)
 
         # Inner Edges on the opposite side of the road
-        self.l_boundaries = Vector3.readn(f, self.num_vertexes, '<')
-        self.stop_light_pos = Vector3.readn(f, 2, '<')
+        self.l_boundaries = f.read_array('<f4', self.num_vertexes * 3).reshape(-1, 3)
+        self.stop_light_pos = f.read_array('<f4', 2 * 3).reshape(-1, 3)
         self.lane_widths = read_unpack(f, '<5f')
         self.lane_lengths = read_unpack(f, '<10f')
 
-    def read(f: BinaryIO) -> 'aiStreet':
+    @staticmethod
+    def read(f: BinaryReader) -> 'aiStreet':
         result = aiStreet()
         result.load(f)
         return result
+    
+    @staticmethod
+    def skip(f: BinaryReader) -> None:
+        _, num_vertexes, num_lanes, num_sidewalks = get_struct('<4H').unpack_from(f.data, f.offset)
+        
+        # Header (76 bytes), offset and vertex blocks (16 bytes per lane vertex, 100 bytes per center vertex) and trailer (92 bytes)
+        f.seek(168 + (16 * num_vertexes * (num_lanes + num_sidewalks)) + (100 * num_vertexes), 1)
 
 
 class aiIntersection:
-    def load(self, f: BinaryIO) -> None:
-        self.id, = read_unpack(f, '<H')
-        self.position = Vector3.read(f, '<')
+    def load(self, f: BinaryReader) -> None:
+        self.id, x, y, z = read_unpack(f, '<H3f')
+        self.position = Vector3(x, y, z)
 
         num_sinks, = read_unpack(f, '<H')
         self.sinks = read_unpack(f, f'<{num_sinks}I')
@@ -4954,11 +6804,18 @@ class aiIntersection:
         self.directions = read_unpack(f, f'<{num_sinks + num_sources}f')
 
     @staticmethod
-    def read(f: BinaryIO) -> 'aiIntersection':
+    def read(f: BinaryReader) -> 'aiIntersection':
         result = aiIntersection()
         result.load(f)
         return result
-
+    
+    @staticmethod
+    def skip(f: BinaryReader) -> None:
+        f.seek(14, 1)
+        num_sinks, = read_unpack(f, '<H')
+        f.seek(4 * num_sinks, 1)
+        num_sources, = read_unpack(f, '<H')
+        f.seek(4 * num_sources + 8 * (num_sinks + num_sources), 1)
 
 
 def read_array_list(f) -> List[int]:
@@ -4966,6 +6823,26 @@ def read_array_list(f) -> List[int]:
     return read_unpack(f, f'<{num_items}I')
 
 
+class aiRecords:
+    def __init__(self, data: bytes, offsets: List[int], record_type) -> None:
+        self.data = data
+        self.offsets = offsets
+        self.record_type = record_type
+        self.cache = {}
+        
+    def __len__(self) -> int:
+        return len(self.offsets)
+    
+    def __getitem__(self, index: int):
+        if index not in self.cache:
+            self.cache[index] = self.record_type.read(BinaryReader(self.data, self.offsets[index]))
+        return self.cache[index]
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
 class aiMap:
     def __init__(self):
         self.paths = []
@@ -4974,15 +6851,26 @@ class aiMap:
         self.ped_roads = []
 
     def load(self, f: BinaryIO) -> None:
+        f = BinaryReader.wrap(f)
         num_isects, num_paths = read_unpack(f, '<2H')
 
         print(f"{num_paths} roads, {num_isects} isects")
 
+        # Index the records first, they are only decoded when accessed
+        street_offsets = []
+        
         for _ in range(num_paths):
-            self.paths.append(aiStreet.read(f))
+            street_offsets.append(f.tell())
+            aiStreet.skip(f)
+            
+        intersection_offsets = []
 
         for _ in range(num_isects):
-            self.intersections.append(aiIntersection.read(f))
+            intersection_offsets.append(f.tell())
+            aiIntersection.skip(f)
+            
+        self.paths = aiRecords(f.data, street_offsets, aiStreet)
+        self.intersections = aiRecords(f.data, intersection_offsets, aiIntersection)
 
         num_cells, = read_unpack(f, '<I')
 
@@ -4992,7 +6880,7 @@ class aiMap:
         for _ in range(num_cells):
             self.ped_roads.append(read_array_list(f))
 
-
+    @staticmethod
     def read(f: BinaryIO) -> 'aiMap':
         result = aiMap()
         result.load(f)
@@ -5045,6 +6933,18 @@ class MiniParser:
         elif isinstance(value, Vector3):
             self.print(f'{value.x:.2f} {value.y:.2f} {value.z:.2f}')
             
+        elif isinstance(value, np.ndarray) and value.ndim == 2:
+            self.print('[\n')
+            self.indent += 1
+            for x, y, z in value.tolist():
+                self.print(f'{x:.2f} {y:.2f} {z:.2f}')
+                self.print('\n')
+            self.indent -= 1
+            self.print(']')
+            
+        elif isinstance(value, np.ndarray):
+            self.value(tuple(value.tolist()))
+            
         else:
             raise Exception(f'Invalid Value Type {type(value)}')
 
@@ -5061,12 +6961,12 @@ class MiniParser:
 def read_ai(input_file: Path):
     ai_map = aiMap()
 
-    with open(input_file, "rb") as f:
-        ai_map.load(f)
+    f = BinaryReader.open(input_file)
+    ai_map.load(f)
 
-        here = f.tell()
-        f.seek(0, 2)
-        assert here == f.tell()
+    here = f.tell()
+    f.seek(0, 2)
+    assert here == f.tell()
 
     streets = []
     
@@ -5094,11 +6994,11 @@ def read_ai(input_file: Path):
 
         for lane in range(1, path.num_lanes):
             here = lane * path.num_vertexes
-            assert path.lane_vertices[here] == sink_isect
-            assert path.lane_vertices[here + path.num_vertexes - 1] == source_isect
+            assert np.array_equal(path.lane_vertices[here], sink_isect)
+            assert np.array_equal(path.lane_vertices[here + path.num_vertexes - 1], source_isect)
 
         if path.num_sidewalks == 0:  # Only custom paths should have no sidewalks
-            assert all(v == Vector3(0, 1, 0) for v in path.normals)  # If there are no sidewalks, all normals are straight up
+            assert (path.normals == (0, 1, 0)).all()  # If there are no sidewalks, all normals are straight up
 
         isect_id = path.intersection_ids[0]
         isect = ai_map.intersections[isect_id]
@@ -5169,17 +7069,17 @@ def validate_and_prepare_ai_paths(streets) -> List[Any]:
         assert paths[0].num_sidewalks == paths[1].num_sidewalks
         assert paths[0].divided == paths[1].divided
         assert paths[0].alley == paths[1].alley
-        assert paths[0].normals == list(reversed(paths[1].normals))
-        assert paths[0].normals[0] == Vector3(0, 1, 0)
-        assert paths[0].normals[-1] == Vector3(0, 1, 0)
+        assert np.array_equal(paths[0].normals, paths[1].normals[::-1])
+        assert np.array_equal(paths[0].normals[0], (0, 1, 0))
+        assert np.array_equal(paths[0].normals[-1], (0, 1, 0))
 
         if paths[0].num_sidewalks != 0:
             for n in range(1, len(paths[0].normals) - 1):
-                target = paths[0].normals[n]
+                target = Vector3(*paths[0].normals[n].tolist())
 
-                a = paths[0].lane_vertices[n]
-                b = paths[0].boundaries[paths[0].num_vertexes + n - 1]
-                c = paths[0].boundaries[paths[0].num_vertexes + n]
+                a = Vector3(*paths[0].lane_vertices[n].tolist())
+                b = Vector3(*paths[0].boundaries[paths[0].num_vertexes + n - 1].tolist())
+                c = Vector3(*paths[0].boundaries[paths[0].num_vertexes + n].tolist())
 
                 normal = calc_normal(a, b, c)
                 angle = math.degrees(target.Angle(normal))
@@ -5190,12 +7090,12 @@ def validate_and_prepare_ai_paths(streets) -> List[Any]:
             for road in range(2):
                 path = paths[road]
 
-                assert path.boundaries[path.num_vertexes:] == list(reversed(paths[road ^ 1].l_boundaries))
+                assert np.array_equal(path.boundaries[path.num_vertexes:], paths[road ^ 1].l_boundaries[::-1])
 
-                for i in range(path.num_vertexes):
-                    a = path.lane_vertices[i + (path.num_lanes * path.num_vertexes)]
-                    b = (path.boundaries[i] + path.boundaries[i + path.num_vertexes]) * 0.5
-                    assert a.Dist2(b) < 0.00001
+                split = path.num_lanes * path.num_vertexes
+                a = path.lane_vertices[split:split + path.num_vertexes].astype(np.float64)
+                b = (path.boundaries[:path.num_vertexes].astype(np.float64) + path.boundaries[path.num_vertexes:]) * 0.5
+                assert (((b - a) ** 2).sum(axis = 1) < 0.00001).all()
         
         prepared_data.append(paths)
     
@@ -5225,12 +7125,14 @@ def write_ai_paths(prepared_data: List[Any], file_path_pattern: Path) -> None:
             for road in range(2):
                 path = paths[road]
                 split = path.num_lanes * path.num_vertexes
-                all_vertexs += path.lane_vertices[0:split]
+                all_vertexs.append(path.lane_vertices[0:split])
 
             if path.num_sidewalks:
                 for road in range(2):
                     path = paths[road]
-                    all_vertexs += path.boundaries
+                    all_vertexs.append(path.boundaries)
+                    
+            all_vertexs = np.concatenate(all_vertexs)
 
             expected_count = paths[0].num_vertexes * (paths[0].num_lanes + paths[1].num_lanes + (paths[0].num_sidewalks + paths[1].num_sidewalks) * 2)
 
@@ -5243,10 +7145,10 @@ def write_ai_paths(prepared_data: List[Any], file_path_pattern: Path) -> None:
             # Yes, these are "supposed" to be backwards
             parser.field("IntersectionType[0]", paths[1].intersection_type)
             parser.field("IntersectionType[1]", paths[0].intersection_type)
-            parser.field("StopLightPos[0]", paths[1].stop_light_pos[0])
-            parser.field("StopLightPos[1]", paths[1].stop_light_pos[1])
-            parser.field("StopLightPos[2]", paths[0].stop_light_pos[0])
-            parser.field("StopLightPos[3]", paths[0].stop_light_pos[1])
+            parser.field("StopLightPos[0]", Vector3(*paths[1].stop_light_pos[0].tolist()))
+            parser.field("StopLightPos[1]", Vector3(*paths[1].stop_light_pos[1].tolist()))
+            parser.field("StopLightPos[2]", Vector3(*paths[0].stop_light_pos[0].tolist()))
+            parser.field("StopLightPos[3]", Vector3(*paths[0].stop_light_pos[1].tolist()))
             
             parser.field("StopLightIndex", paths[0].stop_light_index)
         
@@ -7424,6 +9326,379 @@ def process_and_visualize_paths(input_folder: Path, output_file: Path, visualize
     add_road_paths(polyline_blocks)
     apply_path_color_scheme()
             
+###################################################################################################################
+###################################################################################################################
+#! ======================= CODEC BENCHMARK ======================= !#
+
+
+def create_benchmark_bounds(output_file: Path, num_records: int) -> None:
+    rng = np.random.default_rng(0)
+    num_vertices = min(num_records * 4, 0xFFFF)
+    
+    bnd_vertices = VertexBuffer(num_vertices)
+    bnd_vertices.extend(rng.uniform(-1000.0, 1000.0, (num_vertices, 3)))
+    
+    bnd_polys = PolygonTable(num_records + 1)
+    bnd_polys.append(Default.POLYGON)
+    
+    vertex_indices = rng.integers(0, num_vertices, (num_records, 4)).tolist()
+    plane_edges = rng.uniform(-1.0, 1.0, (num_records, 4, 3)).tolist()
+    plane_normals = rng.uniform(-1.0, 1.0, (num_records, 3)).tolist()
+    plane_distances = rng.uniform(-100.0, 100.0, num_records).tolist()
+    
+    for i in range(num_records):
+        bnd_polys.append(Polygon(
+            i % 0xFFFF + 1, 0, Shape.QUAD, vertex_indices[i], 
+            [Vector3(*edge) for edge in plane_edges[i]], Vector3(*plane_normals[i]), plane_distances[i]
+            ))
+        
+    with open(output_file, "wb") as f:
+        # The random polygons span the whole Map, so only the records are benchmarked, not the grid or the edges
+        Bounds.initialize(bnd_vertices, bnd_polys, grid_cell_size = None, set_edges = False).write(f)
+        
+
+def create_benchmark_meshes(output_file: Path, num_records: int) -> None:
+    rng = np.random.default_rng(0)
+    num_vertices = num_records * 4
+    
+    mesh_vertices = [Vector3(*vertex) for vertex in rng.uniform(-100.0, 100.0, (num_vertices, 3)).tolist()]
+    tex_coords = rng.uniform(0.0, 10.0, num_vertices * 2).tolist()
+    enclosed_shape = [i % 0x10000 for i in range(num_vertices)]
+    indices_sides = [[(i * 4 + corner) % 0x10000 for corner in range(4)] for i in range(num_records)]
+    
+    Meshes(
+        Magic.MESH, num_vertices, num_vertices, num_records, num_vertices, 
+        100.0, 100.0 ** 2, 100.0, 
+        1, agiMeshSet.TEXCOORDS_AND_NORMALS, 0, 
+        ["BENCHMARK"], mesh_vertices, [2] * num_vertices, tex_coords, 
+        enclosed_shape, [0] * num_records, indices_sides
+        ).write(output_file)
+    
+    
+def create_benchmark_portals(output_file: Path, num_records: int) -> None:
+    rng = np.random.default_rng(0)
+    cells = rng.integers(1, 0xFFFF, (num_records, 2)).tolist()
+    edges = rng.uniform(-1000.0, 1000.0, (num_records, 2, 3)).tolist()
+    
+    portals = [
+        Portals(Portal.ACTIVE, Shape.LINE, Default.GAP_2, cell_1, cell_2, 50.0, Vector3(*edge_min), Vector3(*edge_max)) 
+        for (cell_1, cell_2), (edge_min, edge_max) in zip(cells, edges)
+        ]
+    
+    write_benchmark_portals(portals, output_file)
+    
+    
+def write_benchmark_portals(portals: List[Portals], output_file: Path) -> None:
+    with open(output_file, "wb") as f:
+        Portals.write_n(f, portals)
+        
+        for portal in portals:
+            portal.write(f)
+            
+            
+def create_benchmark_bangers(output_file: Path, num_records: int) -> None:
+    rng = np.random.default_rng(0)
+    values = rng.uniform(-1000.0, 1000.0, (num_records, 2, 3)).tolist()
+    
+    bangers = [
+        Bangers(Default.ROOM, PROP_COLLIDE_FLAG, Vector3(*offset), Vector3(*face), f"tp_{i}") 
+        for i, (offset, face) in enumerate(values)
+        ]
+    
+    Bangers.write_all(output_file, bangers, False)
+    
+    
+def create_benchmark_facades(output_file: Path, num_records: int) -> None:
+    rng = np.random.default_rng(0)
+    values = rng.uniform(-1000.0, 1000.0, (num_records, 10)).tolist()
+    
+    facades = [
+        Facades(Default.ROOM, 0, Vector3(*value[0:3]), Vector3(*value[3:6]), Vector3(*value[6:9]), value[9], f"ofbldg_{i}") 
+        for i, value in enumerate(values)
+        ]
+    
+    Facades.write_all(output_file, facades)
+    
+    
+def create_benchmark_physics(output_file: Path, num_records: int) -> None:
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0.0, 10.0, (num_records, 12)).tolist()
+    
+    physics = [
+        PhysicsEditor(f"MATERIAL_{i}", *value[0:7], i % 10, i % 5, Vector2(*value[7:9]), Vector3(*value[9:12])) 
+        for i, value in enumerate(values)
+        ]
+    
+    PhysicsEditor.write_all(output_file, physics)
+    
+    
+def create_benchmark_dlp(output_file: Path, num_records: int) -> None:
+    rng = np.random.default_rng(0)
+    num_groups = max(1, num_records // 64)
+    
+    groups = [
+        DLPGroup(f"GROUP_{i}", 4, len(patch_indices), [0, 1, 2, 3], patch_indices) 
+        for i, patch_indices in enumerate(np.array_split(np.arange(num_records) % 0x10000, num_groups))
+        ]
+    
+    patches = []
+    
+    for i in range(num_records):
+        patch_vertices = np.zeros(4, dtype = DLPVertex.DTYPE)
+        patch_vertices['id'] = np.arange(4)
+        patch_vertices['normal'] = rng.uniform(-1.0, 1.0, (4, 3))
+        patch_vertices['uv'] = rng.uniform(0.0, 1.0, (4, 2))
+        patch_vertices['color'] = 0xFFFFFFFF
+        patches.append(DLPPatch(2, 2, 1289, 0, 0, 0, 0, patch_vertices, f"PATCH_{i}"))
+        
+    dlp_vertices = rng.uniform(-100.0, 100.0, (num_records * 4, 3))
+    
+    DLP(Magic.DEVELOPMENT, len(groups), len(patches), len(dlp_vertices), groups, patches, dlp_vertices).write(output_file, True)
+    
+    
+def create_benchmark_ai(output_file: Path, num_records: int) -> None:
+    rng = np.random.default_rng(0)
+    num_intersections = max(1, num_records // 4)
+    num_vertexes, num_lanes, num_sidewalks = 8, 2, 2
+    num_lane_vertexes = num_vertexes * (num_lanes + num_sidewalks)
+    
+    def random_floats(count: int) -> bytes:
+        return rng.uniform(-1000.0, 1000.0, count).astype('<f4').tobytes()
+    
+    with open(output_file, "wb") as f:
+        write_pack(f, '<2H', num_intersections, num_records)
+        
+        for i in range(num_records):
+            write_pack(f, '<12H2f', i, num_vertexes, num_lanes, num_sidewalks, 0, IntersectionType.STOP_LIGHT, 0, 0, 1, 1, 0, 0, 100.0, 30.0)
+            write_binary_name(f, "STOP_LIGHT", length = 32)
+            write_pack(f, '<3I', 0, 0, 0)
+            f.write(random_floats(num_lane_vertexes + num_vertexes))
+            write_pack(f, '<2I', i % num_intersections, (i + 1) % num_intersections)
+            f.write(random_floats(num_lane_vertexes * 3 + num_vertexes * 3 * 8 + 2 * 3 + 5 + 10))
+            
+        for i in range(num_intersections):
+            write_pack(f, '<H3f', i, *rng.uniform(-1000.0, 1000.0, 3).tolist())
+            write_pack(f, '<H2I', 2, i, i + 1)
+            write_pack(f, '<H2I', 2, i + 2, i + 3)
+            write_pack(f, '<4I4f', i, i + 1, i + 2, i + 3, 0.0, 90.0, 180.0, 270.0)
+            
+        write_pack(f, '<I', 1)
+        write_pack(f, '<2I', 1, 0)
+        write_pack(f, '<2I', 1, 0)
+        
+        
+def read_benchmark_ai(input_file: Path) -> aiMap:
+    with open(input_file, "rb") as f:
+        ai_map = aiMap.read(f)
+        
+    # Streets and intersections are decoded lazily, so touch every record
+    for _ in ai_map.paths:
+        pass
+    
+    for _ in ai_map.intersections:
+        pass
+    
+    return ai_map
+
+
+def write_benchmark_bounds(bnd: Bounds, output_file: Path) -> None:
+    with open(output_file, "wb") as f:
+        bnd.write(f)
+        
+        
+class CodecBenchmark:
+    def __init__(self, name: str, extension: str, 
+                 create: Callable[[Path, int], None], read: Callable[[Path], Any], 
+                 write: Optional[Callable[[Any, Path], None]]) -> None:
+        
+        self.name = name
+        self.extension = extension
+        self.create = create
+        self.read = read
+        self.write = write
+        
+    @staticmethod
+    def time_call(function: Callable, *args) -> float:
+        start_time = time.perf_counter()
+        function(*args)
+        return max(time.perf_counter() - start_time, 1e-9)
+    
+    @staticmethod
+    def rates(prefix: str, num_records: int, num_bytes: int, elapsed_time: float) -> Dict[str, float]:
+        return {
+            f"{prefix}_seconds": elapsed_time,
+            f"{prefix}_records_per_second": num_records / elapsed_time,
+            f"{prefix}_mb_per_second": num_bytes / elapsed_time / 1024 ** 2
+            }
+        
+    def run(self, work_folder: Path, num_records: int, repeats: int) -> Dict[str, Any]:
+        input_file = work_folder / f"{self.name}{self.extension}"
+        output_file = work_folder / f"{self.name}_ROUND_TRIP{self.extension}"
+        
+        self.create(input_file, num_records)
+        file_size = input_file.stat().st_size
+        
+        decode_time = min(self.time_call(self.read, input_file) for _ in range(repeats))
+        result = {"records": num_records, "bytes": file_size, **self.rates("decode", num_records, file_size, decode_time)}
+        
+        # There is no writer for this format, only decoding is measured
+        if self.write is None:
+            result["lossless"] = None
+            return result
+        
+        data = self.read(input_file)
+        encode_time = min(self.time_call(self.write, data, output_file) for _ in range(repeats))
+        result.update(self.rates("encode", num_records, file_size, encode_time))
+        result["lossless"] = input_file.read_bytes() == output_file.read_bytes()
+        
+        return result
+    
+    
+CODEC_BENCHMARKS = [
+    CodecBenchmark("BOUNDS", ".BND", create_benchmark_bounds, partial(read_binary_file, Bounds.read), write_benchmark_bounds),
+    CodecBenchmark("MESHES", ".BMS", create_benchmark_meshes, Meshes.read, Meshes.write),
+    CodecBenchmark("PORTALS", ".PTL", create_benchmark_portals, partial(read_binary_file, Portals.read_all), write_benchmark_portals),
+    CodecBenchmark("BANGERS", ".BNG", create_benchmark_bangers, partial(read_binary_file, Bangers.read_all), 
+                   lambda bangers, output_file: Bangers.write_all(output_file, bangers, False)),
+    CodecBenchmark("FACADES", ".FCD", create_benchmark_facades, partial(read_binary_file, Facades.read_all), 
+                   lambda facades, output_file: Facades.write_all(output_file, facades)),
+    CodecBenchmark("PHYSICS", ".DB", create_benchmark_physics, partial(read_binary_file, PhysicsEditor.read_all), 
+                   lambda physics, output_file: PhysicsEditor.write_all(output_file, physics)),
+    CodecBenchmark("DLP", ".DLP", create_benchmark_dlp, partial(read_binary_file, DLP.read), 
+                   lambda dlp, output_file: dlp.write(output_file, True)),
+    CodecBenchmark("AI", ".BAI", create_benchmark_ai, read_benchmark_ai, None),
+    ]
+
+
+def run_codec_benchmark(output_folder: Path, num_records: int, repeats: int, benchmark_codecs: bool) -> None:
+    if not benchmark_codecs:
+        return
+    
+    work_folder = output_folder / "FILES"
+    
+    if not work_folder.exists():
+        print(f"The output folder {work_folder} does not exist. Creating it.")
+        work_folder.mkdir(parents = True, exist_ok = True)
+        
+    baseline_file = output_folder / "BASELINE.json"
+    baseline = json.loads(baseline_file.read_text())["codecs"] if baseline_file.exists() else {}
+    
+    results = {}
+    failed_codecs = []
+    
+    for benchmark in CODEC_BENCHMARKS:
+        result = benchmark.run(work_folder, num_records, repeats)
+        results[benchmark.name] = result
+        
+        summary = f"{benchmark.name:<8} decode {result['decode_records_per_second']:>12,.0f} records/s {result['decode_mb_per_second']:>8.2f} MB/s"
+        
+        if "encode_seconds" in result:
+            summary += f" | encode {result['encode_records_per_second']:>12,.0f} records/s {result['encode_mb_per_second']:>8.2f} MB/s"
+            
+        if benchmark.name in baseline:
+            change = result["decode_records_per_second"] / baseline[benchmark.name]["decode_records_per_second"] - 1.0
+            summary += f" | decode {change:+.1%} vs baseline"
+            
+        if result["lossless"] is False:
+            failed_codecs.append(benchmark.name)
+            summary += " | ROUND TRIP MISMATCH"
+            
+        print(summary)
+        
+    report = {
+        "date": datetime.datetime.now().isoformat(timespec = "seconds"),
+        "records": num_records,
+        "repeats": repeats,
+        "codecs": results
+        }
+    
+    (output_folder / "LAST_RUN.json").write_text(json.dumps(report, indent = 4))
+    
+    if not baseline_file.exists():
+        baseline_file.write_text(json.dumps(report, indent = 4))
+        print(f"Wrote the benchmark baseline to {baseline_file}")
+        
+    if failed_codecs:
+        print(f"Reading and writing did not give back the same bytes for: {', '.join(failed_codecs)}")
+        
+###################################################################################################################
+#! ======================= SELF CHECKS ======================= !#
+
+
+def check_bound_vertex_index_limit() -> None:
+    num_vertices = 0xFFFF + 2
+    
+    bnd_vertices = VertexBuffer(num_vertices)
+    bnd_vertices.extend(np.arange(num_vertices * 3, dtype = np.float64).reshape(num_vertices, 3))
+    
+    bnd_polys = PolygonTable(2)
+    bnd_polys.append(Default.POLYGON)
+    bnd_polys.append(Polygon(
+        1, 0, Shape.TRIANGLE, [0, 1, num_vertices - 1, 0], 
+        [Default.VECTOR_3 for _ in range(4)], Vector3(0, 1, 0), 0.0
+        ))
+    
+    bnd = Bounds.initialize(bnd_vertices, bnd_polys, grid_cell_size = None, set_edges = False)
+    
+    try:
+        bnd.write(io.BytesIO())
+    except ValueError:
+        return
+    
+    raise AssertionError(f"Writing vertex index {num_vertices - 1} to a bound file did not raise a ValueError")
+
+
+def check_pvs_corridor_depth(max_depth: int = pvs_max_depth) -> None:
+    # A straight corridor of square cells, every cell can see every other cell through the portals in between
+    num_cells = max_depth + 4
+    
+    corridor_vertices = VertexBuffer()
+    corridor_polys = PolygonTable(num_cells)
+    corridor_registry = CellRegistry()
+    
+    for i in range(num_cells):
+        cell_id = i + 2  # Cell 1 is the Room, which is never a PVS source
+        x = i * 10.0
+        
+        corridor_polys.append(Polygon(
+            cell_id, 0, Shape.QUAD, corridor_vertices.add([(x, 0, 0), (x + 10, 0, 0), (x + 10, 0, 10), (x, 0, 10)]).tolist(), 
+            [Default.VECTOR_3 for _ in range(4)], Vector3(0, 1, 0), 0.0
+            ))
+        corridor_registry.add_polygon(cell_id, 0, True)
+        
+    cells, portals = prepare_portals(corridor_polys, corridor_vertices, 1)
+    cell_pvs = create_cell_pvs(cells, portals, True, 1, num_cells, max_depth, corridor_registry)
+    
+    first_cell, last_cell = 2, num_cells + 1
+    
+    if first_cell not in get_visible_cells(corridor_registry.get_always_visible(), last_cell, cell_pvs):
+        raise AssertionError(f"Cell {first_cell} is hidden from cell {last_cell}, {num_cells - 1} portals away with \"pvs_max_depth\" {max_depth}")
+
+
+SELF_CHECKS = [
+    check_bound_vertex_index_limit,
+    check_pvs_corridor_depth,
+    ]
+
+
+def run_checks(checks: List[Callable[[], None]], run_self_checks: bool) -> None:
+    if not run_self_checks:
+        return
+    
+    failed_checks = []
+    
+    for check in checks:
+        try:
+            check()
+        except Exception as e:
+            failed_checks.append(check.__name__)
+            print(f"{check.__name__}: FAILED ({type(e).__name__}: {e})")
+        else:
+            print(f"{check.__name__}: passed")
+            
+    if failed_checks:
+        print(f"{len(failed_checks)} of {len(checks)} self checks failed: {', '.join(failed_checks)}")
+        
 ###################################################################################################################   
 #! ======================= CALL FUNCTIONS ======================= !#
 
@@ -7436,9 +9711,11 @@ create_races(race_data)
 create_cops_and_robbers(Folder.SHOP_RACE_MAP / "COPSWAYPOINTS.CSV", cnr_waypoints)
 
 check_bound_numbers(polys)
-create_cells(Folder.SHOP_CITY / f"{MAP_FILENAME}.CELLS", polys, truncate_cells)
+portal_cells, portal_tuples = find_all_portals(polys, vertices, Folder.SHOP_CITY / f"{MAP_FILENAME}.PTL", empty_portals)
+cell_pvs = create_cell_pvs(portal_cells, portal_tuples, set_cell_pvs)
+create_cells(Folder.SHOP_CITY / f"{MAP_FILENAME}.CELLS", polys, vertices, truncate_cells, cell_pvs)
 Bounds.create(Folder.SHOP / "BND" / f"{MAP_FILENAME}_HITID.BND", vertices, polys, Folder.DEBUG_RESOURCES / "BOUNDS" / f"{MAP_FILENAME}.txt", debug_bounds)
-Portals.write_all(Folder.SHOP_CITY / f"{MAP_FILENAME}.PTL", polys, vertices, lower_portals, empty_portals, debug_portals)
+Portals.write_all(Folder.SHOP_CITY / f"{MAP_FILENAME}.PTL", portal_tuples, lower_portals, empty_portals, debug_portals)
 aiStreetEditor.create(street_list, set_ai_streets, set_reverse_ai_streets)
 FacadeEditor.create(Folder.SHOP_CITY / f"{MAP_FILENAME}.FCD", facade_list, set_facades, debug_facades)
 PhysicsEditor.edit(Folder.EDITOR_RESOURCES / "PHYSICS" / "PHYSICS.DB", Folder.SHOP / "MTL" / "PHYSICS.DB", custom_physics, set_physics, debug_physics)
@@ -7451,7 +9728,7 @@ for prop in random_props:
     prop_list.extend(prop_editor.place_randomly(**prop))
 prop_editor.process_all(prop_list, set_props)
 
-lighting_instances = LightingEditor.read_file(Folder.EDITOR_RESOURCES / "LIGHTING" / "LIGHTING.CSV")
+lighting_instances = load_cached(Folder.EDITOR_RESOURCES / "LIGHTING" / "LIGHTING.CSV", LightingEditor.read_file)
 LightingEditor.write_file(lighting_instances, lighting_configs, Folder.SHOP_TUNE / "LIGHTING.CSV")
 LightingEditor.debug(lighting_instances, Folder.DEBUG_RESOURCES / "LIGHTING" / "LIGHTING_DATA.txt", debug_lighting)
 
@@ -7490,6 +9767,10 @@ debug_ai(debug_ai_data_file, debug_ai_file,
          str(Path(Folder.USER_RESOURCES) / "AI" / "Street{paths}.road")
     )
 
+# Benchmarking
+run_codec_benchmark(Folder.DEBUG_RESOURCES / "BENCHMARK", benchmark_records, benchmark_repeats, benchmark_codecs)
+run_checks(SELF_CHECKS, run_self_checks)
+
 # Finalizing Part
 create_ar(Folder.SHOP)
 create_commandline(Folder.MIDTOWNMADNESS / "commandline.txt", no_ui, no_ui_type, no_ai, less_logs, more_logs)